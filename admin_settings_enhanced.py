@@ -5,6 +5,7 @@ Enhanced Admin Settings - Add funding controls to existing dashboard
 from flask import render_template, session, redirect, url_for, request, jsonify
 from funding_tracker import FundingTracker
 from accessibility_layer import AccessibilityEngine
+from cache_manager import invalidate_dashboard
 
 funding = FundingTracker()
 accessibility = AccessibilityEngine()
@@ -42,6 +43,7 @@ def register_funding_routes(app):
         
         memory['accessibility_settings'][f'{feature}_enabled'] = enabled
         memory_mgr.save_customer_memory(session['user_id'], memory)
+        invalidate_dashboard(session['user_id'])
         
         return jsonify({'success': True, 'message': f'{feature} {"enabled" if enabled else "disabled"}'})
     
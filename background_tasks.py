@@ -0,0 +1,95 @@
+"""
+Background Tasks - Run side effects (emails, memory-file logging) off the request thread
+Anything submitted here must not touch the Flask request context; capture values first
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix='leax-bg')
+
+# Separate pool for request-time reads so slow background jobs can't starve a page render
+READ_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix='leax-read')
+
+
+def _report_failure(future):
+    """Print the traceback of a failed task - nobody else waits on the future"""
+    exc = future.exception()
+    if exc is not None:
+        print(f"❌ Background task failed: {exc}")
+        traceback.print_exception(type(exc), exc, exc.__traceback__)
+
+
+def submit(fn, *args, **kwargs):
+    """Schedule fn(*args, **kwargs) on the shared pool and return its future"""
+    future = EXECUTOR.submit(fn, *args, **kwargs)
+    future.add_done_callback(_report_failure)
+    return future
+
+
+def fetch_all(*calls):
+    """
+    Run independent (fn, *args) reads concurrently and return their results in order.
+    Exceptions propagate to the caller like a direct call would
+    """
+    futures = [READ_EXECUTOR.submit(fn, *args) for fn, *args in calls]
+    return [future.result() for future in futures]
+
+
+class BatchQueue:
+    """
+    Collect items from request threads and hand them to handler(batch) from a daemon thread.
+    A batch opens with the first queued item and closes flush_interval seconds later,
+    so bursts collapse into one handler call. Pending items are flushed at exit.
+    """
+
+    def __init__(self, handler, flush_interval, max_batch=500, name='leax-batch'):
+        self._handler = handler
+        self._flush_interval = flush_interval
+        self._max_batch = max_batch
+        self._name = name
+
+        self._start()
+        # A preloading server forks after import - the worker thread doesn't survive that
+        os.register_at_fork(after_in_child=self._start)
+        atexit.register(self.flush)
+
+    def _start(self):
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name=self._name, daemon=True).start()
+
+    def put(self, item):
+        """Queue one item - never blocks the caller"""
+        self._queue.put(item)
+
+    def flush(self):
+        """Hand everything queued so far to the handler right now"""
+        batch = self._drain([])
+        if batch:
+            self._dispatch(batch)
+
+    def _drain(self, batch):
+        while len(batch) < self._max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            time.sleep(self._flush_interval)
+            self._dispatch(self._drain([first]))
+
+    def _dispatch(self, batch):
+        try:
+            self._handler(batch)
+        except Exception as exc:
+            print(f"❌ Batch handler failed ({len(batch)} items): {exc}")
+            traceback.print_exc()
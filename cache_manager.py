@@ -0,0 +1,178 @@
+"""
+Cache Manager - Short-lived shared cache for hot read paths
+Uses Redis when REDIS_URL is set, otherwise an in-process TTL cache
+Values are serialized with orjson so Redis and local entries round-trip the same
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+import orjson
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+def user_cache_key(user_id):
+    """Cache key for a users row"""
+    return f"user:{user_id}"
+
+
+def business_cache_key(user_id):
+    """Cache key for a business_info row"""
+    return f"business:{user_id}"
+
+
+KNOWN_EMAILS_KEY = 'emails:known'
+
+# Platform totals behind /admin/stats.json - one global entry, dropped whenever a user is created
+ADMIN_STATS_KEY = 'admin:stats'
+
+
+def analytics_cache_key(user_id):
+    """Cache key for a customer's memory-file analytics"""
+    return f"analytics:{user_id}"
+
+
+def website_cache_key(url):
+    """Cache key for the scraped summary of a business website"""
+    return f"website:{url}"
+
+
+def customization_job_key(job_id):
+    """Cache key for a background /customize save job"""
+    return f"customize:job:{job_id}"
+
+
+DASHBOARD_TABS = ('overview', 'funding', 'accessibility', 'leads', 'setup')
+
+
+def dashboard_cache_key(user_id, tab):
+    """Cache key for one rendered dashboard tab"""
+    return f"dashboard:html:{user_id}:{tab}"
+
+
+class CacheManager:
+    """Get/set JSON-serializable values with a TTL"""
+
+    def __init__(self, redis_url=None, max_connections=32, max_local_entries=10000):
+        self._redis = None
+        # Least recently used first - bounded so write-once keys can't grow a worker forever
+        self._local = OrderedDict()
+        self._max_local_entries = max_local_entries
+        self._sets = {}
+        self._lock = threading.Lock()
+
+        redis_url = redis_url or os.environ.get('REDIS_URL')
+        if redis_url and redis is not None:
+            # One pool per process - requests borrow connections instead of reconnecting
+            pool = redis.ConnectionPool.from_url(redis_url, max_connections=max_connections)
+            self._redis = redis.Redis(connection_pool=pool)
+
+    @property
+    def backend(self):
+        """Name of the active backend"""
+        return 'redis' if self._redis is not None else 'local'
+
+    def get(self, key):
+        """Return the cached value or None on miss"""
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(key)
+            except redis.RedisError:
+                return None
+            return orjson.loads(raw) if raw is not None else None
+
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+        return orjson.loads(raw)
+
+    def set(self, key, value, ttl=300):
+        """Store value under key for ttl seconds"""
+        raw = orjson.dumps(value)
+
+        if self._redis is not None:
+            try:
+                self._redis.setex(key, ttl, raw)
+            except redis.RedisError:
+                pass
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._local[key] = (now + ttl, raw)
+            self._local.move_to_end(key)
+            if len(self._local) > self._max_local_entries:
+                self._evict(now)
+
+    def _evict(self, now):
+        """Sweep expired local entries, then drop least recently used ones down to 90% of the cap"""
+        for key in [key for key, (expires_at, _) in self._local.items() if expires_at < now]:
+            del self._local[key]
+        # Leave headroom so a full cache doesn't re-scan on every following set
+        target = self._max_local_entries * 9 // 10
+        while len(self._local) > target:
+            self._local.popitem(last=False)
+
+    def delete(self, *keys):
+        """Drop keys so the next read goes back to the database"""
+        if not keys:
+            return
+
+        if self._redis is not None:
+            try:
+                self._redis.delete(*keys)
+            except redis.RedisError:
+                pass
+            return
+
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+
+    def add_member(self, key, member):
+        """Add member to the set stored at key (no expiry)"""
+        if self._redis is not None:
+            try:
+                self._redis.sadd(key, member)
+            except redis.RedisError:
+                pass
+            return
+
+        with self._lock:
+            self._sets.setdefault(key, set()).add(member)
+
+    def is_member(self, key, member):
+        """True if member is known to be in the set - a cache outage reads as False"""
+        if self._redis is not None:
+            try:
+                return bool(self._redis.sismember(key, member))
+            except redis.RedisError:
+                return False
+
+        with self._lock:
+            return member in self._sets.get(key, ())
+
+
+# Shared process-wide instance
+cache = CacheManager()
+
+
+def invalidate_dashboard(user_id):
+    """Drop every cached dashboard tab for a user"""
+    cache.delete(*(dashboard_cache_key(user_id, tab) for tab in DASHBOARD_TABS))
+
+
+def invalidate_user(user_id):
+    """Drop the cached users row and every dashboard tab rendered from it"""
+    cache.delete(user_cache_key(user_id), *(dashboard_cache_key(user_id, tab) for tab in DASHBOARD_TABS))
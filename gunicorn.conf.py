@@ -0,0 +1,41 @@
+"""
+Gunicorn settings - picked up automatically by `gunicorn main:app` from the app directory
+"""
+
+import multiprocessing
+import os
+
+from cache_manager import cache
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+
+# Load main.py once in the master so workers share the warmed templates copy-on-write
+preload_app = True
+
+# Threads overlap the OpenAI/Twilio/SQLite waits inside each worker
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Without Redis the cache (customize jobs, invalidations) lives in-process, so a second
+# worker would never see the first one's entries - refuse it rather than serve stale state
+if cache.backend == 'local':
+    workers = 1
+    if int(os.environ.get('WEB_CONCURRENCY') or 1) > 1:
+        print("⚠️ WEB_CONCURRENCY ignored - multiple workers need REDIS_URL for the shared cache")
+elif os.environ.get('WEB_CONCURRENCY'):
+    workers = int(os.environ['WEB_CONCURRENCY'])
+else:
+    workers = multiprocessing.cpu_count() * 2 + 1
+
+# AI replies can take a while - don't kill a worker mid-call
+timeout = 120
+
+# Hold idle client connections a little longer than the default 2s so the proxy can reuse them
+keepalive = 5
+
+
+def on_starting(server):
+    """Command-line -w overrides this file - apply the single-worker rule to the final count"""
+    if cache.backend == 'local' and server.num_workers > 1:
+        server.log.warning("Running 1 worker instead of %s - multiple workers need REDIS_URL", server.num_workers)
+        server.num_workers = 1
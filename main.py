@@ -1,24 +1,40 @@
 # ==================== IMPORTS & INITIALIZATION ====================
-from flask import Flask, request, jsonify, render_template, redirect, url_for, session, flash
+from flask import Flask, Response, request, jsonify, render_template, stream_template, redirect, url_for, session, flash, stream_with_context
+from jinja2 import FileSystemBytecodeCache
+from flask.json.provider import DefaultJSONProvider
+from flask_compress import Compress
 from twilio.twiml.voice_response import VoiceResponse, Gather
 from twilio.twiml.messaging_response import MessagingResponse
 import openai
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-import json
+import orjson
 import time
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timezone
 import paypalrestsdk
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import hashlib
+import hmac
+import bcrypt
 import secrets
+import tempfile
+import threading
 import logging
 from contextlib import contextmanager
+from functools import lru_cache
+from collections import OrderedDict
 import re
+import html
+import string
+import cProfile
+import pstats
+import io
 
 # IMPORT MEMORY MANAGER AND NEW MODULES
 from memory_manager import MemoryManager
@@ -30,14 +46,88 @@ from health_check import register_health_check
 from trial_manager import TrialManager, require_trial_or_paid
 from payment_processor import register_payment_routes
 from admin_override import is_admin, get_admin_privileges
+import background_tasks
+from cache_manager import cache, user_cache_key, business_cache_key, KNOWN_EMAILS_KEY, ADMIN_STATS_KEY, website_cache_key, customization_job_key, DASHBOARD_TABS, dashboard_cache_key, invalidate_dashboard, invalidate_user
+
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify/request.json through orjson; types orjson doesn't know fall back to Flask's default"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 # Initialize Flask app FIRST
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get('FLASK_SECRET', 'leax-super-secure-2024-8f7d2a9c1e6b4a0d5c8e2f1b7a9d4c3')
 
+# Compile templates once and keep them resident - no mtime checks per render
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+app.jinja_options = {**app.jinja_options, 'cache_size': 400, 'auto_reload': False,
+                     # Drop the indentation/newlines around {% %} tags from every rendered page
+                     'trim_blocks': True, 'lstrip_blocks': True}
+
+# Persist compiled template bytecode so fresh workers skip the Jinja parser
+JINJA_CACHE_DIR = os.environ.get('JINJA_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'leax_jinja_cache'))
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+app.jinja_options['bytecode_cache'] = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+
+# Static assets are fingerprinted by content, so browsers may cache them for a year
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000
+
+# Compress HTML/CSS/JSON responses; the auth pages shrink ~8x
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
+# Level 4 gets nearly all of the ratio on HTML at a fraction of level 6's CPU (br defaults to 4)
+app.config['COMPRESS_LEVEL'] = 4
+# Streamed pages must flush chunk by chunk, not be buffered for compression
+app.config['COMPRESS_STREAMS'] = False
+Compress(app)
+
+@lru_cache(maxsize=None)
+def _static_version(filename):
+    """Short content hash of a static file, computed once per process"""
+    with open(os.path.join(app.static_folder, filename), 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()[:10]
+
+@app.template_global()
+def static_url(filename):
+    """url_for('static') with a cache-busting version query"""
+    return url_for('static', filename=filename, v=_static_version(filename))
+
+@app.after_request
+def _immutable_static(response):
+    """Versioned asset URLs never change content - tell browsers not to revalidate"""
+    if request.endpoint == 'static' and 'v' in request.args and response.status_code == 200:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    return response
+
 # ==================== CONFIGURATION ====================
 openai.api_key = os.environ.get('OPENAI_API_KEY')
 
+# AI models - fast tier for routine texts, smart tier for hot leads
+FAST_MODEL = 'gpt-3.5-turbo'
+SMART_MODEL = 'gpt-4'
+HOT_LEAD_SCORE = 70
+
+# Estimated USD per OpenAI token by model, used for conversation cost tracking
+MODEL_TOKEN_COST = {
+    FAST_MODEL: 0.000002,
+    SMART_MODEL: 0.00003,
+}
+
+def token_cost(model, tokens):
+    """Estimated USD for tokens spent on model - unknown models are billed at the smart rate"""
+    return tokens * MODEL_TOKEN_COST.get(model, MODEL_TOKEN_COST[SMART_MODEL])
+
+PLAN_TYPES = ('basic', 'standard', 'enterprise')
+
+# bcrypt work factor - tune so one login check costs ~50-100 ms on the host
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+
 # PayPal Configuration
 paypalrestsdk.configure({
     "mode": os.environ.get('PAYPAL_MODE', 'sandbox'),
@@ -56,6 +146,16 @@ SMTP_PASSWORD = os.environ.get('EMAIL_PASSWORD')
 # Database Configuration
 DATABASE_FILE = os.environ.get('DATABASE_FILE', 'leax_users.db')
 
+# Shared HTTP session - keeps connections alive between website scrapes
+_HTTP = requests.Session()
+_HTTP.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+})
+_HTTP.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                                    max_retries=Retry(total=2, backoff_factor=0.3)))
+_HTTP.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                                   max_retries=Retry(total=2, backoff_factor=0.3)))
+
 # INITIALIZE ALL SYSTEMS
 memory_mgr = MemoryManager()
 accessibility = AccessibilityEngine()
@@ -68,6 +168,35 @@ register_payment_routes(app)
 register_funding_routes(app)
 
 # ==================== EMAIL NOTIFICATION SYSTEM ====================
+def _now():
+    """Current UTC time in the 'YYYY-MM-DD HH:MM:SS' shape of SQLite's CURRENT_TIMESTAMP"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+# One SMTP session per process - TLS and AUTH happen once, not per email
+_smtp_lock = threading.Lock()
+_smtp_server = None
+
+def smtp_send(msg, attempts=3):
+    """Send msg on the shared SMTP session, reconnecting with backoff if the server dropped it"""
+    global _smtp_server
+    
+    with _smtp_lock:
+        for attempt in range(attempts):
+            try:
+                if _smtp_server is None:
+                    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=30)
+                    server.starttls()
+                    server.login(SMTP_USERNAME, SMTP_PASSWORD)
+                    _smtp_server = server
+                _smtp_server.send_message(msg)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+                # Idle sessions get closed server-side - start over on a fresh one
+                _smtp_server = None
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(2 ** attempt)
+
 class EmailNotifier:
     """Send comprehensive email notifications"""
     
@@ -90,11 +219,7 @@ class EmailNotifier:
             msg.attach(part1)
             msg.attach(part2)
             
-            server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-            server.starttls()
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
-            server.send_message(msg)
-            server.quit()
+            smtp_send(msg)
             
             print(f"✅ Email sent: {subject}")
             return True
@@ -107,7 +232,11 @@ class EmailNotifier:
         """Notify about new customer signup"""
         subject = f"🎉 NEW SIGNUP: {user_data['business_name']}"
         
-        html = f"""
+        # Business name and email are typed in by the person signing up
+        business_name_html = html.escape(user_data['business_name'] or '')
+        email_html = html.escape(user_data['email'] or '')
+        
+        html_body = f"""
         <!DOCTYPE html>
         <html>
         <body style="font-family: Arial; margin: 20px;">
@@ -116,11 +245,11 @@ class EmailNotifier:
             </div>
             <div style="background: #f8f9fa; padding: 15px; margin: 10px 0; border-radius: 5px;">
                 <h3>Customer Details</h3>
-                <p><strong>Business Name:</strong> {user_data['business_name']}</p>
-                <p><strong>Email:</strong> {user_data['email']}</p>
+                <p><strong>Business Name:</strong> {business_name_html}</p>
+                <p><strong>Email:</strong> {email_html}</p>
                 <p><strong>User ID:</strong> {user_data['user_id']}</p>
                 <p><strong>Plan:</strong> {user_data.get('plan_type', 'basic')}</p>
-                <p><strong>Signup Time:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+                <p><strong>Signup Time:</strong> {user_data.get('created_at') or _now()}</p>
             </div>
         </body>
         </html>
@@ -134,7 +263,7 @@ Email: {user_data['email']}
 User ID: {user_data['user_id']}
         """
         
-        return EmailNotifier.send_notification(subject, html, text)
+        return EmailNotifier.send_notification(subject, html_body, text)
     
     @staticmethod
     def notify_conversation(user_data, conversation_data):
@@ -142,7 +271,11 @@ User ID: {user_data['user_id']}
         comm_type = conversation_data['type'].upper()
         subject = f"💬 {comm_type}: {user_data['business_name']}"
         
-        html = f"""
+        # The message body is whatever the caller texted - escape it for the HTML part
+        content_html = html.escape(conversation_data['content'] or '')
+        business_name_html = html.escape(user_data['business_name'] or '')
+        
+        html_body = f"""
         <!DOCTYPE html>
         <html>
         <body style="font-family: Arial; margin: 20px;">
@@ -150,9 +283,9 @@ User ID: {user_data['user_id']}
                 <h1>💬 NEW {comm_type}</h1>
             </div>
             <div style="background: #f8f9fa; padding: 15px; margin: 10px 0; border-radius: 5px;">
-                <h3>Customer: {user_data['business_name']}</h3>
-                <p><strong>From:</strong> {conversation_data['from_number']}</p>
-                <p><strong>Content:</strong> {conversation_data['content']}</p>
+                <h3>Customer: {business_name_html}</h3>
+                <p><strong>From:</strong> {html.escape(conversation_data['from_number'] or '')}</p>
+                <p><strong>Content:</strong> {content_html}</p>
             </div>
         </body>
         </html>
@@ -164,20 +297,74 @@ From: {conversation_data['from_number']}
 Content: {conversation_data['content']}
         """
         
-        return EmailNotifier.send_notification(subject, html, text)
+        return EmailNotifier.send_notification(subject, html_body, text)
+    
+    @staticmethod
+    def notify_conversation_digest(user_data, conversations):
+        """One email covering several messages/calls for the same business"""
+        subject = f"💬 {len(conversations)} NEW MESSAGES: {user_data['business_name']}"
+        
+        items_html = ''.join(f"""
+            <div style="background: #f8f9fa; padding: 15px; margin: 10px 0; border-radius: 5px;">
+                <p><strong>{c['type'].upper()} from:</strong> {html.escape(c['from_number'] or '')}</p>
+                <p><strong>Content:</strong> {html.escape(c['content'] or '')}</p>
+            </div>""" for c in conversations)
+        business_name_html = html.escape(user_data['business_name'] or '')
+        
+        html_body = f"""
+        <!DOCTYPE html>
+        <html>
+        <body style="font-family: Arial; margin: 20px;">
+            <div style="background: #007cba; color: white; padding: 20px; border-radius: 10px;">
+                <h1>💬 {len(conversations)} NEW MESSAGES</h1>
+                <h3>Customer: {business_name_html}</h3>
+            </div>
+            {items_html}
+        </body>
+        </html>
+        """
+        
+        text = f"{len(conversations)} NEW MESSAGES: {user_data['business_name']}\n" + '\n'.join(
+            f"{c['type'].upper()} from {c['from_number']}: {c['content']}" for c in conversations
+        )
+        
+        return EmailNotifier.send_notification(subject, html_body, text)
 
 email_notifier = EmailNotifier()
 
 # ==================== DATABASE ====================
+_db_local = threading.local()
+
 @contextmanager
 def get_db():
-    """Database connection context manager"""
-    conn = sqlite3.connect(DATABASE_FILE)
-    conn.row_factory = sqlite3.Row
+    """Database connection context manager - reuses one connection per thread"""
+    conn = getattr(_db_local, 'conn', None)
+    if conn is None:
+        conn = _db_local.conn = _open_db()
+        _db_local.depth = 0
+    
+    _db_local.depth += 1
     try:
         yield conn
     finally:
-        conn.close()
+        _db_local.depth -= 1
+        # Closing used to discard uncommitted work - keep that for the outermost block
+        if _db_local.depth == 0 and conn.in_transaction:
+            conn.rollback()
+
+def _open_db():
+    """Open a connection tuned for concurrent readers"""
+    # Connections live for the whole thread, so a bigger statement cache keeps every
+    # route's queries compiled (the default of 128 is shared by all of them)
+    conn = sqlite3.connect(DATABASE_FILE, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA mmap_size=268435456')
+    conn.execute('PRAGMA cache_size=-65536')
+    conn.execute('PRAGMA busy_timeout=5000')
+    return conn
 
 def init_database():
     """Initialize database with PERSISTENT STORAGE + ACCESSIBILITY"""
@@ -212,6 +399,7 @@ def init_database():
                 website_url TEXT,
                 services TEXT,
                 custom_info TEXT,
+                custom_info_html TEXT,
                 agent_personality TEXT DEFAULT 'Sarah',
                 business_hours TEXT DEFAULT '{}',
                 pricing_info TEXT DEFAULT '{}',
@@ -298,17 +486,202 @@ def init_database():
             )
         ''')
         
+        # Columns added after launch - existing databases pick them up here
+        try:
+            c.execute('ALTER TABLE business_info ADD COLUMN custom_info_html TEXT')
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+        
         c.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_users_created ON users(created_at DESC)')
         c.execute('CREATE INDEX IF NOT EXISTS idx_leads_phone ON leads(phone_number)')
         c.execute('CREATE INDEX IF NOT EXISTS idx_conversations_user ON conversations(user_id)')
         
+        # One lead per caller per business - the lead upsert conflicts on this index
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_leads_user_phone_unique'")
+        if not c.fetchone():
+            # Fold duplicate leads into the oldest row before the unique index can be built -
+            # first carry over what the newer rows learned, then re-point their messages
+            c.execute('''
+                UPDATE leads SET
+                    lead_score = (SELECT MAX(d.lead_score) FROM leads d
+                                  WHERE d.user_id = leads.user_id AND d.phone_number = leads.phone_number),
+                    meeting_scheduled = (SELECT MAX(d.meeting_scheduled) FROM leads d
+                                         WHERE d.user_id = leads.user_id AND d.phone_number = leads.phone_number),
+                    last_contact = (SELECT MAX(d.last_contact) FROM leads d
+                                    WHERE d.user_id = leads.user_id AND d.phone_number = leads.phone_number),
+                    meeting_datetime = COALESCE(
+                        (SELECT d.meeting_datetime FROM leads d
+                         WHERE d.user_id = leads.user_id AND d.phone_number = leads.phone_number
+                           AND d.meeting_datetime IS NOT NULL
+                         ORDER BY d.id DESC LIMIT 1),
+                        meeting_datetime),
+                    contact_name = COALESCE(NULLIF(contact_name, ''),
+                        (SELECT d.contact_name FROM leads d
+                         WHERE d.user_id = leads.user_id AND d.phone_number = leads.phone_number
+                           AND COALESCE(d.contact_name, '') <> ''
+                         ORDER BY d.id DESC LIMIT 1)),
+                    contact_email = COALESCE(NULLIF(contact_email, ''),
+                        (SELECT d.contact_email FROM leads d
+                         WHERE d.user_id = leads.user_id AND d.phone_number = leads.phone_number
+                           AND COALESCE(d.contact_email, '') <> ''
+                         ORDER BY d.id DESC LIMIT 1))
+                WHERE id IN (SELECT MIN(id) FROM leads GROUP BY user_id, phone_number HAVING COUNT(*) > 1)
+            ''')
+            c.execute('''
+                UPDATE lead_conversations SET lead_id = (
+                    SELECT MIN(l2.id) FROM leads l1 JOIN leads l2
+                    ON l2.user_id = l1.user_id AND l2.phone_number = l1.phone_number
+                    WHERE l1.id = lead_conversations.lead_id
+                )
+                WHERE lead_id IN (SELECT id FROM leads)
+            ''')
+            c.execute('DELETE FROM leads WHERE id NOT IN (SELECT MIN(id) FROM leads GROUP BY user_id, phone_number)')
+            c.execute('DROP INDEX IF EXISTS idx_leads_user_phone')
+            c.execute('CREATE UNIQUE INDEX idx_leads_user_phone_unique ON leads(user_id, phone_number)')
+        
+        # id is the tiebreaker that makes /leads keyset paging exact - superseded the 3-column index
+        c.execute('DROP INDEX IF EXISTS idx_leads_user_score')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_leads_user_page ON leads(user_id, lead_score DESC, last_contact DESC, id DESC)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_business_info_user ON business_info(user_id)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_lead_conv_lead ON lead_conversations(lead_id)')
+        
+        # A scheduled meeting always makes a hot lead - enforced in SQL so no extra round-trip
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_meeting_hotlead
+            AFTER UPDATE OF meeting_scheduled, lead_score ON leads
+            WHEN NEW.meeting_scheduled = 1 AND NEW.lead_score < 95
+            BEGIN
+                UPDATE leads SET lead_score = 95, updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+            END
+        ''')
+        
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_meeting_hotlead_insert
+            AFTER INSERT ON leads
+            WHEN NEW.meeting_scheduled = 1 AND NEW.lead_score < 95
+            BEGIN
+                UPDATE leads SET lead_score = 95, updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+            END
+        ''')
+        
+        # Per-user lead counters kept current by triggers - dashboard reads one row instead of scanning leads
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS lead_summary (
+                user_id INTEGER PRIMARY KEY,
+                total_leads INTEGER DEFAULT 0,
+                new_leads INTEGER DEFAULT 0,
+                hot_leads INTEGER DEFAULT 0,
+                meetings_scheduled INTEGER DEFAULT 0
+            )
+        ''')
+        
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_lead_summary_insert
+            AFTER INSERT ON leads
+            BEGIN
+                INSERT OR IGNORE INTO lead_summary (user_id) VALUES (NEW.user_id);
+                UPDATE lead_summary SET
+                    total_leads = total_leads + 1,
+                    new_leads = new_leads + (CASE WHEN NEW.status = 'new' THEN 1 ELSE 0 END),
+                    hot_leads = hot_leads + (CASE WHEN NEW.lead_score >= 70 THEN 1 ELSE 0 END),
+                    meetings_scheduled = meetings_scheduled + (CASE WHEN NEW.meeting_scheduled = 1 THEN 1 ELSE 0 END)
+                WHERE user_id = NEW.user_id;
+            END
+        ''')
+        
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_lead_summary_update
+            AFTER UPDATE OF status, lead_score, meeting_scheduled ON leads
+            BEGIN
+                UPDATE lead_summary SET
+                    new_leads = new_leads - (CASE WHEN OLD.status = 'new' THEN 1 ELSE 0 END) + (CASE WHEN NEW.status = 'new' THEN 1 ELSE 0 END),
+                    hot_leads = hot_leads - (CASE WHEN OLD.lead_score >= 70 THEN 1 ELSE 0 END) + (CASE WHEN NEW.lead_score >= 70 THEN 1 ELSE 0 END),
+                    meetings_scheduled = meetings_scheduled - (CASE WHEN OLD.meeting_scheduled = 1 THEN 1 ELSE 0 END) + (CASE WHEN NEW.meeting_scheduled = 1 THEN 1 ELSE 0 END)
+                WHERE user_id = NEW.user_id;
+            END
+        ''')
+        
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_lead_summary_delete
+            AFTER DELETE ON leads
+            BEGIN
+                UPDATE lead_summary SET
+                    total_leads = total_leads - 1,
+                    new_leads = new_leads - (CASE WHEN OLD.status = 'new' THEN 1 ELSE 0 END),
+                    hot_leads = hot_leads - (CASE WHEN OLD.lead_score >= 70 THEN 1 ELSE 0 END),
+                    meetings_scheduled = meetings_scheduled - (CASE WHEN OLD.meeting_scheduled = 1 THEN 1 ELSE 0 END)
+                WHERE user_id = OLD.user_id;
+            END
+        ''')
+        
+        # Rebuild from leads on startup so rows written before the triggers existed are counted
+        c.execute('DELETE FROM lead_summary')
+        c.execute('''
+            INSERT INTO lead_summary (user_id, total_leads, new_leads, hot_leads, meetings_scheduled)
+            SELECT user_id,
+                   COUNT(*),
+                   COUNT(CASE WHEN status = 'new' THEN 1 END),
+                   COUNT(CASE WHEN lead_score >= 70 THEN 1 END),
+                   COUNT(CASE WHEN meeting_scheduled = 1 THEN 1 END)
+            FROM leads GROUP BY user_id
+        ''')
+        
         conn.commit()
 
 init_database()
 
 # ==================== UTILITY FUNCTIONS ====================
 def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+def verify_password(password, stored_hash):
+    """Check a password against its stored hash in constant time"""
+    if stored_hash.startswith('$2'):
+        return bcrypt.checkpw(password.encode(), stored_hash.encode())
+    
+    # Accounts created before the bcrypt switch still carry a bare SHA-256 hex digest
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored_hash)
+
+def password_needs_rehash(stored_hash):
+    """True for legacy SHA-256 digests and bcrypt hashes made with a different work factor"""
+    # bcrypt hashes look like $2b$12$... - the cost sits in characters 4-5
+    return not stored_hash.startswith('$2') or stored_hash[4:6] != f'{BCRYPT_ROUNDS:02d}'
+
+def get_user_cached(user_id):
+    """users row as a dict, served from cache for up to 5 minutes"""
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is not None:
+        return user
+    
+    with get_db() as conn:
+        row = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+    
+    if row is None:
+        return None
+    
+    user = dict(row)
+    user.pop('password_hash', None)
+    cache.set(key, user, ttl=300)
+    return user
+
+def get_business_cached(user_id):
+    """business_info row as a dict, served from cache until the next customization save"""
+    key = business_cache_key(user_id)
+    business = cache.get(key)
+    if business is not None:
+        return business
+    
+    with get_db() as conn:
+        row = conn.execute('SELECT * FROM business_info WHERE user_id = ?', (user_id,)).fetchone()
+    
+    if row is None:
+        return None
+    
+    business = dict(row)
+    cache.set(key, business, ttl=3600)
+    return business
 
 def normalize_url(url):
     """Add https:// if missing"""
@@ -320,12 +693,15 @@ def normalize_url(url):
     return url
 
 def scrape_website_info(url):
-    """Scrape website to get business info"""
+    """Scrape website to get business info - a site is fetched at most once a day"""
     try:
         url = normalize_url(url)
-        response = requests.get(url, timeout=15, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        key = website_cache_key(url)
+        info = cache.get(key)
+        if info is not None:
+            return info
+        
+        response = _HTTP.get(url, timeout=15)
         soup = BeautifulSoup(response.content, 'html.parser')
         
         text_content = soup.get_text(separator=' ', strip=True)
@@ -355,15 +731,27 @@ def scrape_website_info(url):
         if meta_desc:
             info['description'] = meta_desc.get('content', '')
         
+        cache.set(key, info, ttl=86400)
         return info
     except Exception as e:
         print(f"Website scrape error: {e}")
         return None
 
 def generate_example_prompts(business_name, custom_info):
-    """Generate personalized example prompts"""
+    """Generate personalized example prompts - reused until the business details change"""
     try:
-        prompt = f"""Based on this business info, generate 3 SHORT (5-8 words) example customer questions:
+        return list(_example_prompts(business_name, custom_info))
+    except:
+        return [
+            "What are your hours?",
+            "How much do you charge?",
+            "Are you available today?"
+        ]
+
+@lru_cache(maxsize=1024)
+def _example_prompts(business_name, custom_info):
+    """LLM example questions - raises on failure so the fallback is never cached"""
+    prompt = f"""Based on this business info, generate 3 SHORT (5-8 words) example customer questions:
 
 Business: {business_name}
 Info: {custom_info or 'General service provider'}
@@ -373,24 +761,61 @@ Return ONLY a JSON array of 3 strings, like:
 
 Keep questions natural and relevant to their business."""
 
-        completion = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=100
-        )
-        
-        examples = json.loads(completion.choices[0].message.content)
-        return examples[:3]
-    except:
-        return [
-            "What are your hours?",
-            "How much do you charge?",
-            "Are you available today?"
-        ]
+    completion = openai.ChatCompletion.create(
+        model="gpt-3.5-turbo",
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.7,
+        max_tokens=100
+    )
+    
+    examples = orjson.loads(completion.choices[0].message.content)
+    return tuple(examples[:3])
+
+# Intent analyses keyed on the normalized start of the message - "Hi" and "hi " share one entry
+INTENT_CACHE_SIZE = 4096
+INTENT_KEY_LENGTH = 200
+_intent_cache = OrderedDict()
+_intent_cache_lock = threading.Lock()
+_intent_cache_stats = {'hits': 0, 'misses': 0}
+
+def intent_cache_info():
+    """Hit/miss counters for /health, in the same shape as lru_cache.cache_info()"""
+    with _intent_cache_lock:
+        return {**_intent_cache_stats, 'maxsize': INTENT_CACHE_SIZE, 'currsize': len(_intent_cache)}
 
 def analyze_customer_intent(message):
-    """Analyze customer message"""
+    """Analyze customer message - repeated messages reuse the earlier analysis"""
+    key = ' '.join(message.lower().split())[:INTENT_KEY_LENGTH]
+    with _intent_cache_lock:
+        analysis = _intent_cache.get(key)
+        if analysis is not None:
+            _intent_cache.move_to_end(key)
+            _intent_cache_stats['hits'] += 1
+            return dict(analysis)
+        _intent_cache_stats['misses'] += 1
+    
+    try:
+        # The model sees the message as typed - casing matters for names and places
+        analysis = _analyze_intent(message)
+    except:
+        return {
+            "project_type": "general_inquiry",
+            "urgency": "flexible",
+            "potential_budget": "unknown",
+            "location": "unknown",
+            "key_requirements": "",
+            "contact_willingness": "maybe",
+            "decision_maker": "maybe"
+        }
+    
+    with _intent_cache_lock:
+        _intent_cache[key] = analysis
+        if len(_intent_cache) > INTENT_CACHE_SIZE:
+            _intent_cache.popitem(last=False)
+    return dict(analysis)
+
+def _analyze_intent(message):
+    """LLM intent extraction - raises on failure so errors are never cached"""
     prompt = f"""
     Analyze this customer message and extract structured information:
     
@@ -408,64 +833,66 @@ def analyze_customer_intent(message):
     Return ONLY valid JSON, no other text.
     """
     
-    try:
-        completion = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
-            max_tokens=200
-        )
-        analysis = completion.choices[0].message.content
-        return json.loads(analysis)
-    except:
-        return {
-            "project_type": "general_inquiry",
-            "urgency": "flexible",
-            "potential_budget": "unknown",
-            "location": "unknown",
-            "key_requirements": "",
-            "contact_willingness": "maybe",
-            "decision_maker": "maybe"
-        }
+    completion = openai.ChatCompletion.create(
+        model="gpt-3.5-turbo",
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.3,
+        max_tokens=200
+    )
+    analysis = completion.choices[0].message.content
+    return orjson.loads(analysis)
+
+_PROJECT_SCORES = {
+    "emergency": 90,
+    "immediate": 80,
+    "urgent": 70,
+    "specific_project": 60,
+    "quote_request": 50,
+    "general_inquiry": 30
+}
+
+_URGENCY_SCORES = {
+    "immediate": 40,
+    "this_week": 30,
+    "next_week": 20,
+    "flexible": 10
+}
+
+_BUDGET_SCORES = {
+    "high": 20,
+    "enterprise": 20,
+    "medium": 10
+}
 
 def calculate_lead_score(intent_analysis, message_length, has_contact_info, meeting_scheduled=False):
     """Calculate lead quality score"""
-    score = 0
-    
     if meeting_scheduled:
         return 95
     
-    project_scores = {
-        "emergency": 90,
-        "immediate": 80,
-        "urgent": 70,
-        "specific_project": 60,
-        "quote_request": 50,
-        "general_inquiry": 30
-    }
-    
-    score += project_scores.get(intent_analysis.get('project_type', 'general_inquiry'), 30)
-    
-    urgency_scores = {
-        "immediate": 40,
-        "this_week": 30,
-        "next_week": 20,
-        "flexible": 10
-    }
-    
-    score += urgency_scores.get(intent_analysis.get('urgency', 'flexible'), 10)
+    budget = intent_analysis.get('potential_budget')
     
-    if intent_analysis.get('potential_budget') in ['high', 'enterprise']:
-        score += 20
-    elif intent_analysis.get('potential_budget') == 'medium':
-        score += 10
+    return _score_lead(
+        intent_analysis.get('project_type', 'general_inquiry'),
+        intent_analysis.get('urgency', 'flexible'),
+        budget if isinstance(budget, str) else None,
+        bool(has_contact_info),
+        intent_analysis.get('contact_willingness') == 'yes',
+        intent_analysis.get('decision_maker') == 'yes'
+    )
+
+@lru_cache(maxsize=4096)
+def _score_lead(project_type, urgency, budget, has_contact_info, willing_to_share, decision_maker):
+    """Pure scoring on hashable intent signals - memoized since signatures repeat constantly"""
+    score = _PROJECT_SCORES.get(project_type, 30)
+    score += _URGENCY_SCORES.get(urgency, 10)
+    score += _BUDGET_SCORES.get(budget, 0)
     
     if has_contact_info:
         score += 30
-    elif intent_analysis.get('contact_willingness') == 'yes':
+    elif willing_to_share:
         score += 20
     
-    if intent_analysis.get('decision_maker') == 'yes':
+    if decision_maker:
         score += 15
     
     return min(score, 100)
@@ -482,37 +909,41 @@ def send_comprehensive_lead_email(lead_data, conversation_history, business_info
         msg['From'] = EMAIL_FROM
         msg['To'] = EMAIL_TO
         
+        # Lead fields come from SMS text and model output - escape each once for the HTML part
+        shown = {key: html.escape(str(value)) for key, value in lead_data.items() if value is not None}
+        business_name_html = html.escape(str(business_info.get('business_name', 'N/A')))
+        
         meeting_info = ""
         if lead_data.get('meeting_scheduled'):
             meeting_info = f"""
             <div style="background: #28a745; color: white; padding: 15px; margin: 10px 0; border-radius: 5px;">
                 <h3>✅ MEETING SCHEDULED!</h3>
-                <p><strong>Time:</strong> {lead_data.get('meeting_datetime', 'TBD')}</p>
+                <p><strong>Time:</strong> {shown.get('meeting_datetime', 'TBD')}</p>
             </div>
             """
         
-        html = f"""
+        html_body = f"""
         <!DOCTYPE html>
         <html>
         <body style="font-family: Arial; margin: 20px;">
             <div style="background: #dc3545; color: white; padding: 20px; border-radius: 10px;">
                 <h1>🚨 HOT LEAD - CALL NOW!</h1>
-                <h2>Score: {lead_data.get('lead_score', 0)}/100</h2>
+                <h2>Score: {shown.get('lead_score', 0)}/100</h2>
             </div>
             {meeting_info}
             <div style="background: #fff3cd; padding: 15px; margin: 10px 0;">
                 <h3>📋 LEAD DETAILS</h3>
-                <p><strong>Business:</strong> {business_info.get('business_name', 'N/A')}</p>
-                <p><strong>Phone:</strong> {lead_data.get('phone_number', 'N/A')}</p>
-                <p><strong>Contact Name:</strong> {lead_data.get('contact_name', 'Not provided')}</p>
-                <p><strong>Email:</strong> {lead_data.get('contact_email', 'Not provided')}</p>
-                <p><strong>Project:</strong> {lead_data.get('project_type', 'N/A')}</p>
-                <p><strong>Urgency:</strong> {lead_data.get('urgency', 'N/A')}</p>
-                <p><strong>Budget:</strong> {lead_data.get('budget', 'Not specified')}</p>
+                <p><strong>Business:</strong> {business_name_html}</p>
+                <p><strong>Phone:</strong> {shown.get('phone_number', 'N/A')}</p>
+                <p><strong>Contact Name:</strong> {shown.get('contact_name', 'Not provided')}</p>
+                <p><strong>Email:</strong> {shown.get('contact_email', 'Not provided')}</p>
+                <p><strong>Project:</strong> {shown.get('project_type', 'N/A')}</p>
+                <p><strong>Urgency:</strong> {shown.get('urgency', 'N/A')}</p>
+                <p><strong>Budget:</strong> {shown.get('budget', 'Not specified')}</p>
             </div>
             <div style="background: #f8f9fa; padding: 15px; margin: 10px 0;">
                 <h3>📞 CALL THIS NUMBER NOW!</h3>
-                <h2>{lead_data.get('phone_number', 'N/A')}</h2>
+                <h2>{shown.get('phone_number', 'N/A')}</h2>
             </div>
         </body>
         </html>
@@ -531,16 +962,12 @@ Meeting: {'SCHEDULED - ' + str(lead_data.get('meeting_datetime', 'TBD')) if lead
         """
         
         part1 = MIMEText(text, 'plain')
-        part2 = MIMEText(html, 'html')
+        part2 = MIMEText(html_body, 'html')
         
         msg.attach(part1)
         msg.attach(part2)
         
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        smtp_send(msg)
         
         print(f"✅ LEAD EMAIL SENT")
         return True
@@ -549,23 +976,103 @@ Meeting: {'SCHEDULED - ' + str(lead_data.get('meeting_datetime', 'TBD')) if lead
         print(f"❌ EMAIL FAILED: {e}")
         return False
 
-def update_lead_conversation(lead_id, user_id, message_text, response_text, intent_analysis):
-    """Update lead conversation"""
-    with get_db() as conn:
-        c = conn.cursor()
-        
-        c.execute('''
-            INSERT INTO lead_conversations 
-            (lead_id, user_id, message_text, response_text, intent_detected, needs_identified)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (lead_id, user_id, message_text, response_text, 
-              json.dumps(intent_analysis), intent_analysis.get('key_requirements', '')))
-        
-        c.execute('UPDATE leads SET last_contact = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (lead_id,))
-        
-        conn.commit()
+def _send_email_batch(batch):
+    """Send queued notifications - messages for the same business collapse into one digest"""
+    conversations_by_user = {}
+    
+    for kind, *payload in batch:
+        if kind == 'conversation':
+            user_data, conversation_data = payload
+            conversations_by_user.setdefault(user_data['user_id'], (user_data, []))[1].append(conversation_data)
+        elif kind == 'lead':
+            send_comprehensive_lead_email(*payload)
+    
+    for user_data, conversations in conversations_by_user.values():
+        if len(conversations) == 1:
+            email_notifier.notify_conversation(user_data, conversations[0])
+        else:
+            email_notifier.notify_conversation_digest(user_data, conversations)
+
+# Webhooks only enqueue; SMTP happens here in 5-second windows
+email_queue = background_tasks.BatchQueue(_send_email_batch, flush_interval=5, name='leax-email')
+
+def _write_memory_batch(batch):
+    """Apply queued memory-file writes in arrival order, one bulk log per user between customer updates"""
+    pending_logs = {}
+    
+    def flush_logs(user_id):
+        conversations = pending_logs.pop(user_id, None)
+        if conversations:
+            memory_mgr.log_conversations_bulk(user_id, conversations)
+    
+    for kind, user_id, *payload in batch:
+        if kind == 'log':
+            pending_logs.setdefault(user_id, []).extend(payload[0])
+        elif kind == 'customer':
+            flush_logs(user_id)
+            memory_mgr.update_customer_info(user_id, *payload)
+    
+    for user_id in list(pending_logs):
+        flush_logs(user_id)
+
+# Memory files are read-modify-write JSON, so every webhook write goes through this one thread
+memory_queue = background_tasks.BatchQueue(_write_memory_batch, flush_interval=0.1, name='leax-memory')
+
+# Kept as one constant string so sqlite3's statement cache reuses the compiled statement
+_INSERT_LEAD_CONV_SQL = '''
+    INSERT INTO lead_conversations 
+    (lead_id, user_id, message_text, response_text, intent_detected, needs_identified)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# Create or refresh a caller's lead in one statement. The DO UPDATE expressions read the
+# pre-update row; :contact_score applies once the lead has left a name or email
+_UPSERT_LEAD_SQL = '''
+    INSERT INTO leads 
+    (user_id, phone_number, project_type, urgency, budget, status, lead_score, meeting_scheduled)
+    VALUES (:user_id, :phone_number, :new_project_type, :urgency, :budget, 'new', :lead_score, :meeting)
+    ON CONFLICT(user_id, phone_number) DO UPDATE SET
+        project_type = CASE WHEN :project_type <> 'general_inquiry' THEN :project_type ELSE leads.project_type END,
+        meeting_datetime = CASE WHEN :meeting AND NOT leads.meeting_scheduled THEN CURRENT_TIMESTAMP ELSE leads.meeting_datetime END,
+        meeting_scheduled = CASE WHEN :meeting THEN 1 ELSE leads.meeting_scheduled END,
+        lead_score = CASE WHEN COALESCE(leads.contact_name, '') <> '' OR COALESCE(leads.contact_email, '') <> ''
+                          THEN :contact_score ELSE :lead_score END,
+        last_contact = CURRENT_TIMESTAMP,
+        updated_at = CURRENT_TIMESTAMP
+    RETURNING id
+'''
+
+def upsert_lead(c, user_id, phone_number, intent_analysis, message_length, meeting):
+    """Create or refresh the lead for phone_number and return its id"""
+    c.execute(_UPSERT_LEAD_SQL, {
+        'user_id': user_id,
+        'phone_number': phone_number,
+        'new_project_type': intent_analysis.get('project_type', 'inquiry'),
+        'project_type': intent_analysis.get('project_type'),
+        'urgency': intent_analysis.get('urgency', 'flexible'),
+        'budget': intent_analysis.get('potential_budget', 'unknown'),
+        'lead_score': calculate_lead_score(intent_analysis, message_length, False),
+        'contact_score': calculate_lead_score(intent_analysis, message_length, True),
+        'meeting': 1 if meeting else 0
+    })
+    return c.fetchone()['id']
+
+def update_lead_conversation(lead_id, user_id, message_text, response_text, intent_analysis, conn=None):
+    """Update lead conversation - pass conn to write inside the caller's transaction (caller commits)"""
+    if conn is None:
+        with get_db() as conn:
+            update_lead_conversation(lead_id, user_id, message_text, response_text, intent_analysis, conn)
+            conn.commit()
         
+        invalidate_dashboard(user_id)
         return {'lead_id': lead_id}
+    
+    conn.execute(_INSERT_LEAD_CONV_SQL, (lead_id, user_id, message_text, response_text, 
+                                         orjson.dumps(intent_analysis).decode(), intent_analysis.get('key_requirements', '')))
+    
+    conn.execute('UPDATE leads SET last_contact = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP WHERE id = ?', (lead_id,))
+    
+    return {'lead_id': lead_id}
 
 def check_for_meeting_info(message, ai_response):
     """Check if meeting was scheduled"""
@@ -606,8 +1113,13 @@ def check_for_sale_closed(message, ai_response):
     return has_commitment or (ai_asked_to_schedule and len(message_lower) > 5 and not has_rejection)
 
 # ==================== AI PROMPT ====================
-def generate_human_response(business_name, business_context, customer_message, conversation_history=""):
-    """Generate HUMAN responses"""
+def generate_human_response(business_name, business_context, customer_message, conversation_history="",
+                            model=SMART_MODEL):
+    """
+    Generate HUMAN responses
+    
+    Returns (reply, tokens)
+    """
     
     prompt = f"""You are Sarah, a friendly team member at {business_name}. You answer texts/calls like a real person would.
 
@@ -634,9 +1146,11 @@ CURRENT CUSTOMER MESSAGE:
 
 NOW RESPOND LIKE A REAL HUMAN WHO WANTS TO CLOSE THIS DEAL (2-3 sentences max):"""
     
+    fallback = f"Hey! Thanks for reaching out to {business_name}. Can you tell me more about what you need? That way I can give you accurate pricing and timing."
+    
     try:
         completion = openai.ChatCompletion.create(
-            model="gpt-4",
+            model=model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.8,
             max_tokens=150
@@ -644,7 +1158,7 @@ NOW RESPOND LIKE A REAL HUMAN WHO WANTS TO CLOSE THIS DEAL (2-3 sentences max):"
         return completion.choices[0].message.content, completion['usage']['total_tokens']
     except Exception as e:
         print(f"AI Error: {e}")
-        return f"Hey! Thanks for reaching out to {business_name}. Can you tell me more about what you need? That way I can give you accurate pricing and timing.", 0
+        return fallback, 0
 
 # ==================== TEST AGENT ====================
 @app.route('/test-agent')
@@ -655,13 +1169,7 @@ def test_agent():
     trial_status = trial_mgr.get_trial_status(session['user_id'])
     trials_remaining = trial_status.get('messages_remaining', 0)
     
-    with get_db() as conn:
-        c = conn.cursor()
-        c.execute('SELECT * FROM users WHERE id = ?', (session['user_id'],))
-        user = c.fetchone()
-        
-        c.execute('SELECT * FROM business_info WHERE user_id = ?', (session['user_id'],))
-        business = c.fetchone()
+    business = get_business_cached(session['user_id'])
     
     examples = generate_example_prompts(
         session.get('business_name'),
@@ -678,149 +1186,101 @@ def test_chat(trial_info=None):
     if 'user_id' not in session:
         return jsonify({'error': 'Not logged in'})
     
+    user_id = session['user_id']
+    business_name = session.get('business_name')
+    
     data = request.json
     user_message = data.get('message')
     
-    # Simulate human typing delay
-    import time
+    # Simulated human typing delay - the browser waits it out, not the worker
     typing_delay = min(3, max(1, len(user_message) * 0.05))
-    time.sleep(typing_delay)
     
     # Get conversation history
     conversation_context = memory_mgr.get_conversation_context(
-        session['user_id'], 
+        user_id, 
         'TEST-USER',
         last_n_messages=10
     )
     
-    with get_db() as conn:
-        c = conn.cursor()
-        c.execute('SELECT * FROM business_info WHERE user_id = ?', (session['user_id'],))
-        business = c.fetchone()
+    business = get_business_cached(user_id)
     
     business_context = f"""
-Business: {session.get('business_name')}
+Business: {business_name}
 Services: {business['custom_info'] if business and business['custom_info'] else 'Full service provider'}
 Website: {business['website_url'] if business and business['website_url'] else 'Not provided'}
 """
     
     # Generate response
     ai_reply, tokens = generate_human_response(
-        session.get('business_name'),
+        business_name,
         business_context,
         user_message,
         conversation_context
     )
     
     # Track with funding system if captions enabled
-    if accessibility.user_wants_captions(session['user_id']):
+    if accessibility.user_wants_captions(user_id):
         funding.track_billable_event(
-            user_id=session['user_id'],
+            user_id=user_id,
             event_type='caption',
             duration_seconds=len(ai_reply) * 2,  # Estimate
             from_number='TEST-USER'
         )
     
     # Log conversations
-    memory_mgr.log_conversation(session['user_id'], {
+    memory_queue.put(('log', user_id, [{
         'type': 'sms',
         'direction': 'inbound',
         'from_number': 'TEST-USER',
         'to_number': 'AI-AGENT',
         'content': user_message,
-        'ai_model': 'gpt-4',
+        'ai_model': SMART_MODEL,
         'tokens': tokens,
-        'cost': tokens * 0.00003
-    })
-    
-    memory_mgr.log_conversation(session['user_id'], {
+        'cost': token_cost(SMART_MODEL, tokens)
+    }, {
         'type': 'sms',
         'direction': 'outbound',
         'from_number': 'AI-AGENT',
         'to_number': 'TEST-USER',
         'content': ai_reply,
         'ai_response': ai_reply,
-        'ai_model': 'gpt-4',
+        'ai_model': SMART_MODEL,
         'tokens': 0,
         'cost': 0
-    })
+    }]))
     
-    # Save to database
+    # Classify before opening the write transaction - these are API calls
+    intent_analysis = analyze_customer_intent(user_message)
+    sale_closed = check_for_sale_closed(user_message, ai_reply)
+    meeting_scheduled = check_for_meeting_info(user_message, ai_reply)
+    
+    # Save to database - one write transaction
     with get_db() as conn:
         c = conn.cursor()
+        c.execute('BEGIN IMMEDIATE')
         
-        c.execute('''
+        c.executemany('''
             INSERT INTO conversations (user_id, phone_number, message_text, response_text, message_direction, tokens_used, cost_usd)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (session['user_id'], 'TEST-USER', user_message, ai_reply, 'incoming', tokens, tokens * 0.00003))
+        ''', [(user_id, 'TEST-USER', user_message, ai_reply, 'incoming', tokens, token_cost(SMART_MODEL, tokens)),
+              (user_id, 'TEST-USER', ai_reply, '', 'outgoing', 0, 0)])
         
-        c.execute('''
-            INSERT INTO conversations (user_id, phone_number, message_text, response_text, message_direction)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (session['user_id'], 'TEST-USER', ai_reply, '', 'outgoing'))
-        
-        # Update/create lead
-        c.execute('SELECT * FROM leads WHERE phone_number = ? AND user_id = ?', ('TEST-USER', session['user_id']))
-        existing_lead = c.fetchone()
-        
-        intent_analysis = analyze_customer_intent(user_message)
-        sale_closed = check_for_sale_closed(user_message, ai_reply)
-        meeting_scheduled = check_for_meeting_info(user_message, ai_reply)
-        
-        if existing_lead:
-            lead_id = existing_lead['id']
-            has_contact_info = bool(existing_lead['contact_name'] or existing_lead['contact_email'])
-            new_score = calculate_lead_score(intent_analysis, len(user_message), has_contact_info, meeting_scheduled or sale_closed)
-            
-            updates = []
-            params = []
-            
-            if intent_analysis.get('project_type') != 'general_inquiry':
-                updates.append('project_type = ?')
-                params.append(intent_analysis['project_type'])
-            
-            if meeting_scheduled or sale_closed:
-                updates.append('meeting_scheduled = 1')
-            
-            updates.append('lead_score = ?')
-            params.append(new_score)
-            updates.append('last_contact = CURRENT_TIMESTAMP')
-            
-            params.append(lead_id)
-            
-            if updates:
-                c.execute(f'''UPDATE leads SET {', '.join(updates)} WHERE id = ?''', params)
-        else:
-            lead_score = calculate_lead_score(intent_analysis, len(user_message), False, meeting_scheduled or sale_closed)
-            
-            c.execute('''
-                INSERT INTO leads 
-                (user_id, phone_number, project_type, urgency, budget, status, lead_score, meeting_scheduled)
-                VALUES (?, ?, ?, ?, ?, 'new', ?, ?)
-            ''', (session['user_id'], 'TEST-USER', 
-                  intent_analysis.get('project_type', 'inquiry'),
-                  intent_analysis.get('urgency', 'flexible'),
-                  intent_analysis.get('potential_budget', 'unknown'),
-                  lead_score,
-                  1 if (meeting_scheduled or sale_closed) else 0))
-            
-            lead_id = c.lastrowid
+        lead_id = upsert_lead(c, user_id, 'TEST-USER', intent_analysis, len(user_message),
+                              meeting_scheduled or sale_closed)
         
-        c.execute('''
-            INSERT INTO lead_conversations 
-            (lead_id, user_id, message_text, response_text, intent_detected, needs_identified)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (lead_id, session['user_id'], user_message, ai_reply, 
-              json.dumps(intent_analysis), intent_analysis.get('key_requirements', '')))
+        c.execute(_INSERT_LEAD_CONV_SQL, (lead_id, user_id, user_message, ai_reply, 
+                                          orjson.dumps(intent_analysis).decode(), intent_analysis.get('key_requirements', '')))
         
         conn.commit()
     
-    memory_mgr.update_customer_info(session['user_id'], 'TEST-USER', {
+    invalidate_dashboard(user_id)
+    
+    memory_queue.put(('customer', user_id, 'TEST-USER', {
         'last_inquiry': user_message,
         'meeting_scheduled': meeting_scheduled or sale_closed
-    })
+    }))
     
-    print(f"✅ Test conversation logged for user {session['user_id']}")
+    print(f"✅ Test conversation logged for user {user_id}")
     
     return jsonify({
         'reply': ai_reply, 
@@ -829,19 +1289,29 @@ Website: {business['website_url'] if business and business['website_url'] else '
     })
 
 # ==================== LIVE AGENT ENDPOINT ====================
+# Carrier keywords Twilio answers itself (opt-out/opt-in/help) - plus empty bodies, nothing to reply to
+_SMS_NO_REPLY_BODIES = frozenset({'', 'STOP', 'STOPALL', 'UNSUBSCRIBE', 'CANCEL', 'END', 'QUIT',
+                                  'START', 'UNSTOP', 'HELP', 'INFO'})
+_EMPTY_TWIML = str(MessagingResponse())
+
 @app.route('/agent/<user_id>', methods=['POST'])
 def ai_agent(user_id):
     """Live AI agent - handles SMS and VOICE"""
-    with get_db() as conn:
-        c = conn.cursor()
-        c.execute('SELECT * FROM users WHERE id = ? AND is_active = 1', (user_id,))
-        user = c.fetchone()
-        
-        if not user:
-            return "Agent not active", 404
-        
-        c.execute('SELECT * FROM business_info WHERE user_id = ?', (user_id,))
-        business = c.fetchone()
+    user = get_user_cached(user_id)
+    if not user or not user['is_active']:
+        return "Agent not active", 404
+    
+    # Skip the LLM, lead and email pipeline for keyword/empty texts
+    if "SmsMessageSid" in request.form and request.form.get('Body', '').strip().upper() in _SMS_NO_REPLY_BODIES:
+        return _EMPTY_TWIML
+    
+    business = get_business_cached(user_id)
+    
+    existing_lead = None
+    if "SmsMessageSid" in request.form:
+        with get_db() as conn:
+            existing_lead = conn.execute('SELECT * FROM leads WHERE phone_number = ? AND user_id = ?',
+                                         (request.form.get('From', ''), user_id)).fetchone()
     
     # Handle SMS
     if "SmsMessageSid" in request.form:
@@ -849,6 +1319,9 @@ def ai_agent(user_id):
         from_number = request.form.get('From', '')
         to_number = request.form.get('To', '')
         
+        # Hot leads get the smart model, everyone else the faster one
+        model = SMART_MODEL if existing_lead and existing_lead['lead_score'] >= HOT_LEAD_SCORE else FAST_MODEL
+        
         # Get conversation history
         conversation_context = memory_mgr.get_conversation_context(
             user_id, 
@@ -869,7 +1342,8 @@ Website: {business['website_url'] if business and business['website_url'] else '
                 user['business_name'],
                 business_context,
                 captions,
-                conversation_context
+                conversation_context,
+                model=model
             )
             
             # Track billable event
@@ -884,35 +1358,34 @@ Website: {business['website_url'] if business and business['website_url'] else '
                 user['business_name'],
                 business_context,
                 incoming_msg,
-                conversation_context
+                conversation_context,
+                model=model
             )
         
         # Log to memory
-        memory_mgr.log_conversation(user_id, {
+        memory_queue.put(('log', user_id, [{
             'type': 'sms',
             'direction': 'inbound',
             'from_number': from_number,
             'to_number': to_number,
             'content': incoming_msg,
-            'ai_model': 'gpt-4',
+            'ai_model': model,
             'tokens': tokens,
-            'cost': tokens * 0.00003
-        })
-        
-        memory_mgr.log_conversation(user_id, {
+            'cost': token_cost(model, tokens)
+        }, {
             'type': 'sms',
             'direction': 'outbound',
             'from_number': to_number,
             'to_number': from_number,
             'content': ai_reply,
             'ai_response': ai_reply,
-            'ai_model': 'gpt-4',
+            'ai_model': model,
             'tokens': 0,
             'cost': 0
-        })
+        }]))
         
         # Send email notification
-        email_notifier.notify_conversation({
+        email_queue.put(('conversation', {
             'business_name': user['business_name'],
             'email': user['email'],
             'user_id': user_id
@@ -922,76 +1395,36 @@ Website: {business['website_url'] if business and business['website_url'] else '
             'to_number': to_number,
             'direction': 'inbound',
             'content': incoming_msg
-        })
+        }))
+        
+        # Classify before opening the write transaction - these are API calls
+        intent_analysis = analyze_customer_intent(incoming_msg)
+        meeting_scheduled = check_for_meeting_info(incoming_msg, ai_reply)
         
-        # Create/Update Lead
+        # Create/Update Lead and log the exchange in one transaction
         with get_db() as conn:
             c = conn.cursor()
-            c.execute('SELECT * FROM leads WHERE phone_number = ? AND user_id = ?', (from_number, user_id))
-            existing_lead = c.fetchone()
-            
-            intent_analysis = analyze_customer_intent(incoming_msg)
-            meeting_scheduled = check_for_meeting_info(incoming_msg, ai_reply)
-            
-            if existing_lead:
-                lead_id = existing_lead['id']
-                has_contact_info = bool(existing_lead['contact_name'] or existing_lead['contact_email'])
-                new_score = calculate_lead_score(intent_analysis, len(incoming_msg), has_contact_info, meeting_scheduled)
-                
-                updates = []
-                params = []
-                
-                if intent_analysis.get('project_type') != 'general_inquiry':
-                    updates.append('project_type = ?')
-                    params.append(intent_analysis['project_type'])
-                
-                if meeting_scheduled and not existing_lead['meeting_scheduled']:
-                    updates.append('meeting_scheduled = 1')
-                    updates.append('meeting_datetime = CURRENT_TIMESTAMP')
-                
-                updates.append('lead_score = ?')
-                params.append(new_score)
-                updates.append('last_contact = CURRENT_TIMESTAMP')
-                
-                params.append(lead_id)
-                
-                c.execute(f'''UPDATE leads SET {', '.join(updates)} WHERE id = ?''', params)
-                
-                memory_mgr.update_customer_info(user_id, from_number, {
-                    'last_inquiry': incoming_msg,
-                    'meeting_scheduled': meeting_scheduled
-                })
-                
-            else:
-                lead_score = calculate_lead_score(intent_analysis, len(incoming_msg), False, meeting_scheduled)
-                
-                c.execute('''
-                    INSERT INTO leads 
-                    (user_id, phone_number, project_type, urgency, budget, status, lead_score, meeting_scheduled)
-                    VALUES (?, ?, ?, ?, ?, 'new', ?, ?)
-                ''', (user_id, from_number, 
-                      intent_analysis.get('project_type', 'inquiry'),
-                      intent_analysis.get('urgency', 'flexible'),
-                      intent_analysis.get('potential_budget', 'unknown'),
-                      lead_score,
-                      1 if meeting_scheduled else 0))
-                
-                lead_id = c.lastrowid
-                
-                memory_mgr.update_customer_info(user_id, from_number, {
-                    'first_contact': datetime.now().isoformat(),
-                    'last_inquiry': incoming_msg,
-                    'meeting_scheduled': meeting_scheduled
-                })
+            c.execute('BEGIN IMMEDIATE')
             
-            conn.commit()
+            lead_id = upsert_lead(c, user_id, from_number, intent_analysis, len(incoming_msg), meeting_scheduled)
             
-            update_lead_conversation(lead_id, user_id, incoming_msg, ai_reply, intent_analysis)
+            update_lead_conversation(lead_id, user_id, incoming_msg, ai_reply, intent_analysis, conn)
             
             c.execute('SELECT * FROM leads WHERE id = ?', (lead_id,))
             lead_data = dict(c.fetchone())
             
-            send_comprehensive_lead_email(lead_data, [], {'business_name': user['business_name']})
+            conn.commit()
+        
+        invalidate_dashboard(user_id)
+        
+        customer_update = {
+            'last_inquiry': incoming_msg,
+            'meeting_scheduled': meeting_scheduled
+        }
+        if not existing_lead:
+            customer_update['first_contact'] = datetime.now().isoformat()
+        memory_queue.put(('customer', user_id, from_number, customer_update))
+        email_queue.put(('lead', lead_data, [], {'business_name': user['business_name']}))
         
         resp = MessagingResponse()
         resp.message(ai_reply)
@@ -1002,7 +1435,7 @@ Website: {business['website_url'] if business and business['website_url'] else '
         from_number = request.form.get('From', '')
         to_number = request.form.get('To', '')
         
-        memory_mgr.log_conversation(user_id, {
+        memory_queue.put(('log', user_id, [{
             'type': 'call',
             'direction': 'inbound',
             'from_number': from_number,
@@ -1012,7 +1445,7 @@ Website: {business['website_url'] if business and business['website_url'] else '
             'ai_model': 'voice',
             'tokens': 0,
             'cost': 0.01
-        })
+        }]))
         
         resp = VoiceResponse()
         resp.say(
@@ -1057,9 +1490,11 @@ def handle_voicemail(user_id):
         user = c.fetchone()
         
         if user:
-            email_notifier.send_notification(
+            # Twilio is waiting on the TwiML below - send the email off the request thread
+            background_tasks.submit(
+                email_notifier.send_notification,
                 f"📞 VOICEMAIL: {user['business_name']}",
-                f"<p>New voicemail from {from_number}</p><p><a href='{recording_url}'>Listen</a></p>",
+                f"<p>New voicemail from {html.escape(from_number)}</p><p><a href='{html.escape(recording_url)}'>Listen</a></p>",
                 f"Voicemail from {from_number}\n{recording_url}"
             )
     
@@ -1278,19 +1713,29 @@ def login():
             c = conn.cursor()
             c.execute('SELECT * FROM users WHERE email = ? AND is_active = 1', (email,))
             user = c.fetchone()
-        
-        if user and user['password_hash'] == hash_password(password):
-            session['user_id'] = user['id']
-            session['email'] = user['email']
-            session['business_name'] = user['business_name']
-            session['user_plan'] = user['plan_type']
+            authenticated = user is not None and verify_password(password, user['password_hash'])
             
-            with get_db() as conn:
-                c = conn.cursor()
-                c.execute('UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?', (user['id'],))
+            if authenticated:
+                if password_needs_rehash(user['password_hash']):
+                    # The plaintext is only in hand at login - upgrade the stored hash while it is
+                    c.execute('UPDATE users SET password_hash = ?, last_login = CURRENT_TIMESTAMP WHERE id = ?',
+                              (hash_password(password), user['id']))
+                else:
+                    c.execute('UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?', (user['id'],))
                 conn.commit()
+        
+        if authenticated:
+            session.update({
+                'user_id': user['id'],
+                'email': user['email'],
+                'business_name': user['business_name'],
+                'user_plan': user['plan_type']
+            })
+            
+            invalidate_user(user['id'])
             
-            memory_mgr.log_login(
+            background_tasks.submit(
+                memory_mgr.log_login,
                 user_id=user['id'],
                 ip_address=request.remote_addr,
                 user_agent=request.headers.get('User-Agent')
@@ -1301,213 +1746,38 @@ def login():
         else:
             flash('Invalid email or password')
     
-    return '''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Login - LeaX</title>
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            body { 
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                padding: 20px;
-            }
-            .login-container {
-                background: white;
-                padding: 50px 40px;
-                border-radius: 20px;
-                box-shadow: 0 20px 60px rgba(0,0,0,0.2);
-                max-width: 450px;
-                width: 100%;
-            }
-            .logo {
-                font-size: 36px;
-                font-weight: 800;
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                text-align: center;
-                margin-bottom: 30px;
-            }
-            input {
-                width: 100%;
-                padding: 15px;
-                margin: 10px 0;
-                border: 2px solid #e2e8f0;
-                border-radius: 10px;
-                font-size: 16px;
-                transition: border-color 0.3s;
-            }
-            input:focus {
-                outline: none;
-                border-color: #667eea;
-            }
-            button {
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: white;
-                padding: 15px;
-                border: none;
-                cursor: pointer;
-                width: 100%;
-                border-radius: 10px;
-                font-size: 16px;
-                font-weight: 600;
-                margin-top: 10px;
-                transition: transform 0.3s;
-            }
-            button:hover {
-                transform: scale(1.02);
-            }
-            .links {
-                text-align: center;
-                margin-top: 20px;
-                color: #666;
-            }
-            .links a {
-                color: #667eea;
-                text-decoration: none;
-                font-weight: 600;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="login-container">
-            <div class="logo">🤖 LeaX AI</div>
-            <h2 style="text-align: center; margin-bottom: 30px; color: #333;">Welcome Back</h2>
-            
-            <form method="POST">
-                <input type="email" name="email" placeholder="Email Address" required autofocus>
-                <input type="password" name="password" placeholder="Password" required>
-                <button type="submit">Login</button>
-            </form>
-            
-            <div class="links">
-                <p>Don't have an account? <a href="/">Sign up here</a></p>
-            </div>
-        </div>
-    </body>
-    </html>
-    '''
+    return render_template('login.html')
+
+# Signup statements as module constants so sqlite3's statement cache reuses the compiled SQL
+_INSERT_USER_SQL = '''
+    INSERT INTO users (email, password_hash, business_name, status, plan_type, trial_session_used)
+    VALUES (?, ?, ?, 'active', ?, 0)
+    RETURNING id, created_at
+'''
+
+_INSERT_BUSINESS_INFO_SQL = '''
+    INSERT INTO business_info (user_id, agent_personality)
+    VALUES (?, 'Sarah')
+'''
+
+_INSERT_PLAN_TRIAL_SQL = '''
+    INSERT INTO plan_trials (user_id, plan_type, trial_active)
+    VALUES (?, ?, 1)
+'''
+
+@lru_cache(maxsize=None)
+def _register_page(plan):
+    """Register page for a known plan - only three variants exist, render each once"""
+    return render_template('register.html', plan=plan)
 
 @app.route('/register', methods=['GET', 'POST'])
 def register():
     if request.method == 'GET':
         selected_plan = request.args.get('plan', 'basic')
         
-        return f'''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Register - LeaX</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-                body {{ 
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    min-height: 100vh;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    padding: 20px;
-                }}
-                .register-container {{
-                    background: white;
-                    padding: 50px 40px;
-                    border-radius: 20px;
-                    box-shadow: 0 20px 60px rgba(0,0,0,0.2);
-                    max-width: 500px;
-                    width: 100%;
-                }}
-                .logo {{
-                    font-size: 36px;
-                    font-weight: 800;
-                    background: linear-gradient(135deg, #667eea, #764ba2);
-                    -webkit-background-clip: text;
-                    -webkit-text-fill-color: transparent;
-                    text-align: center;
-                    margin-bottom: 10px;
-                }}
-                .plan-badge {{
-                    background: linear-gradient(135deg, #667eea, #764ba2);
-                    color: white;
-                    padding: 10px 20px;
-                    border-radius: 20px;
-                    text-align: center;
-                    margin-bottom: 30px;
-                    font-weight: 600;
-                }}
-                input {{
-                    width: 100%;
-                    padding: 15px;
-                    margin: 10px 0;
-                    border: 2px solid #e2e8f0;
-                    border-radius: 10px;
-                    font-size: 16px;
-                    transition: border-color 0.3s;
-                }}
-                input:focus {{
-                    outline: none;
-                    border-color: #667eea;
-                }}
-                button {{
-                    background: linear-gradient(135deg, #667eea, #764ba2);
-                    color: white;
-                    padding: 15px;
-                    border: none;
-                    cursor: pointer;
-                    width: 100%;
-                    border-radius: 10px;
-                    font-size: 16px;
-                    font-weight: 600;
-                    margin-top: 10px;
-                    transition: transform 0.3s;
-                }}
-                button:hover {{
-                    transform: scale(1.02);
-                }}
-                .links {{
-                    text-align: center;
-                    margin-top: 20px;
-                    color: #666;
-                }}
-                .links a {{
-                    color: #667eea;
-                    text-decoration: none;
-                    font-weight: 600;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="register-container">
-                <div class="logo">🤖 LeaX AI</div>
-                <h2 style="text-align: center; margin-bottom: 20px; color: #333;">Create Your Account</h2>
-                
-                <div class="plan-badge">
-                    🎁 Starting with {selected_plan.upper()} plan - Try FREE!
-                </div>
-                
-                <form method="POST">
-                    <input type="hidden" name="plan_type" value="{selected_plan}">
-                    <input type="email" name="email" placeholder="Business Email" required autofocus>
-                    <input type="text" name="business_name" placeholder="Business Name" required>
-                    <input type="password" name="password" placeholder="Password (min 8 characters)" required minlength="8">
-                    <button type="submit">Create Account & Start Testing</button>
-                </form>
-                
-                <div class="links">
-                    <p>Already have an account? <a href="/login">Login here</a></p>
-                </div>
-            </div>
-        </body>
-        </html>
-        '''
+        if selected_plan in PLAN_TYPES:
+            return _register_page(selected_plan)
+        return render_template('register.html', plan=selected_plan)
     
     elif request.method == 'POST':
         email = request.form.get('email')
@@ -1519,26 +1789,23 @@ def register():
             flash('Password must be at least 8 characters')
             return redirect(url_for('register'))
         
+        # Fast duplicate check - the UNIQUE index on users.email stays the real guard
+        if cache.is_member(KNOWN_EMAILS_KEY, email):
+            flash('Email already exists')
+            return redirect(url_for('register'))
+        
+        password_hash = hash_password(password)
+        
         try:
             with get_db() as conn:
                 c = conn.cursor()
-                c.execute('''
-                    INSERT INTO users (email, password_hash, business_name, status, plan_type, trial_session_used)
-                    VALUES (?, ?, ?, 'active', ?, 0)
-                ''', (email, hash_password(password), business_name, plan_type))
-                user_id = c.lastrowid
-                
-                c.execute('''
-                    INSERT INTO business_info (user_id, agent_personality)
-                    VALUES (?, 'Sarah')
-                ''', (user_id,))
-                
-                c.execute('''
-                    INSERT INTO plan_trials (user_id, plan_type, trial_active)
-                    VALUES (?, ?, 1)
-                ''', (user_id, plan_type))
-                
+                user_id, created_at = c.execute(_INSERT_USER_SQL, (email, password_hash, business_name, plan_type)).fetchone()
+                c.execute(_INSERT_BUSINESS_INFO_SQL, (user_id,))
+                c.execute(_INSERT_PLAN_TRIAL_SQL, (user_id, plan_type))
                 conn.commit()
+            
+            cache.add_member(KNOWN_EMAILS_KEY, email)
+            cache.delete(ADMIN_STATS_KEY)
 
             trial_mgr.start_trial(user_id, trial_messages=50, trial_days=7)
             
@@ -1548,22 +1815,26 @@ def register():
                 email=email
             )
             
-            session['user_id'] = user_id
-            session['email'] = email
-            session['business_name'] = business_name
-            session['user_plan'] = plan_type
+            session.update({
+                'user_id': user_id,
+                'email': email,
+                'business_name': business_name,
+                'user_plan': plan_type
+            })
             
-            email_notifier.notify_new_signup({
+            background_tasks.submit(email_notifier.notify_new_signup, {
                 'user_id': user_id,
                 'business_name': business_name,
                 'email': email,
-                'plan_type': plan_type
+                'plan_type': plan_type,
+                'created_at': created_at
             })
             
             flash(f'Account created! You\'re now testing the {plan_type.upper()} plan for free.')
             return redirect(url_for('customize_agent'))
             
         except sqlite3.IntegrityError:
+            cache.add_member(KNOWN_EMAILS_KEY, email)
             flash('Email already exists')
             return redirect(url_for('register'))
 
@@ -1675,22 +1946,18 @@ def payment_success():
                 flash('Session expired. Please try again.')
                 return redirect(url_for('index'))
             
+            password_hash = hash_password(pending['password'])
+            
             with get_db() as conn:
                 c = conn.cursor()
-                c.execute('''
-                    INSERT INTO users (email, password_hash, business_name, status, plan_type, trial_session_used)
-                    VALUES (?, ?, ?, 'active', ?, 0)
-                ''', (pending['email'], hash_password(pending['password']), 
-                      pending['business_name'], pending['plan']))
-                user_id = c.lastrowid
-                
-                c.execute('''
-                    INSERT INTO business_info (user_id, agent_personality)
-                    VALUES (?, 'Sarah')
-                ''', (user_id,))
-                
+                user_id, created_at = c.execute(_INSERT_USER_SQL, (pending['email'], password_hash, 
+                                                                   pending['business_name'], pending['plan'])).fetchone()
+                c.execute(_INSERT_BUSINESS_INFO_SQL, (user_id,))
                 conn.commit()
             
+            cache.add_member(KNOWN_EMAILS_KEY, pending['email'])
+            cache.delete(ADMIN_STATS_KEY)
+            
             # Create memory
             memory_mgr.create_customer_memory(
                 user_id=user_id,
@@ -1699,18 +1966,21 @@ def payment_success():
             )
             
             # Log in user
-            session['user_id'] = user_id
-            session['email'] = pending['email']
-            session['business_name'] = pending['business_name']
-            session['user_plan'] = pending['plan']
+            session.update({
+                'user_id': user_id,
+                'email': pending['email'],
+                'business_name': pending['business_name'],
+                'user_plan': pending['plan']
+            })
             session.pop('pending_user', None)
             
             # Send notification
-            email_notifier.notify_new_signup({
+            background_tasks.submit(email_notifier.notify_new_signup, {
                 'user_id': user_id,
                 'business_name': pending['business_name'],
                 'email': pending['email'],
-                'plan_type': pending['plan']
+                'plan_type': pending['plan'],
+                'created_at': created_at
             })
             
             flash(f'Payment successful! Welcome to LeaX AI {pending["plan"].title()} Plan!')
@@ -1744,25 +2014,34 @@ def dashboard():
     if 'user_id' not in session:
         return redirect(url_for('login'))
 
-    # Get trial status
-    trial_status = trial_mgr.get_trial_status(session['user_id'])
+    user_id = session['user_id']
     
     # Get current tab from URL parameter
     current_tab = request.args.get('tab', 'overview')
     
+    # Rapid refreshes reuse the rendered page for a few seconds
+    cache_key = dashboard_cache_key(user_id, current_tab) if current_tab in DASHBOARD_TABS else None
+    if cache_key:
+        cached_html = cache.get(cache_key)
+        if cached_html is not None:
+            return cached_html
+    
+    # Trial, analytics, funding and memory-file reads hit different stores - run them side by side
+    trial_status, analytics, earnings, ytd, memory = background_tasks.fetch_all(
+        (trial_mgr.get_trial_status, user_id),
+        (memory_mgr.get_customer_analytics, user_id),
+        (funding.get_monthly_earnings, user_id),
+        (funding.get_total_earnings_ytd, user_id),
+        (memory_mgr.load_customer_memory, user_id)
+    )
+    
+    user = get_user_cached(user_id)
+    
     with get_db() as conn:
         c = conn.cursor()
-        c.execute('SELECT * FROM users WHERE id = ?', (session['user_id'],))
-        user = c.fetchone()
         
         # Get lead stats
-        c.execute('''
-            SELECT COUNT(*) as total_leads, 
-                   COUNT(CASE WHEN status = 'new' THEN 1 END) as new_leads,
-                   COUNT(CASE WHEN lead_score >= 70 THEN 1 END) as hot_leads,
-                   COUNT(CASE WHEN meeting_scheduled = 1 THEN 1 END) as meetings_scheduled
-            FROM leads WHERE user_id = ?
-        ''', (session['user_id'],))
+        c.execute('SELECT * FROM lead_summary WHERE user_id = ?', (user_id,))
         lead_stats = c.fetchone()
         
         # Get leads if on leads tab
@@ -1773,18 +2052,10 @@ def dashboard():
                 WHERE user_id = ? 
                 ORDER BY lead_score DESC, last_contact DESC
                 LIMIT 50
-            ''', (session['user_id'],))
-            leads = [dict(row) for row in c.fetchall()]
-    
-    # Get analytics
-    analytics = memory_mgr.get_customer_analytics(session['user_id'])
-    
-    # Get funding earnings
-    earnings = funding.get_monthly_earnings(session['user_id'])
-    ytd = funding.get_total_earnings_ytd(session['user_id'])
+            ''', (user_id,))
+            leads = c.fetchall()
     
     # Get accessibility settings
-    memory = memory_mgr.load_customer_memory(session['user_id'])
     accessibility_settings = memory.get('accessibility_settings', {}) if memory else {}
     
     # Prepare stats
@@ -1795,12 +2066,12 @@ def dashboard():
         'meetings_scheduled': lead_stats['meetings_scheduled'] if lead_stats else 0
     }
     
-    return render_template('complete_dashboard.html',
+    html = render_template('complete_dashboard.html',
         page_title='Dashboard',
         current_tab=current_tab,
         business_name=session['business_name'],
         plan_type=user['plan_type'] if user else 'basic',
-        user_id=session['user_id'],
+        user_id=user_id,
         stats=stats,
         earnings=earnings,
         ytd_earnings=ytd['total_ytd'] if ytd else 0,
@@ -1809,228 +2080,271 @@ def dashboard():
         leads=leads,
         trial_status=trial_status                   
     )
+    
+    if cache_key:
+        cache.set(cache_key, html, ttl=30)
+    
+    return html
+
+_CUSTOMIZE_HEAD = '''<!DOCTYPE html>
+<html>
+<head>
+    <title>Customize Agent - LeaX</title>
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { 
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
+            background: #f5f7fa;
+            min-height: 100vh;
+        }
+        .nav {
+            background: white;
+            padding: 20px 40px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+        }
+        .logo {
+            font-size: 24px;
+            font-weight: 800;
+            background: linear-gradient(135deg, #667eea, #764ba2);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+        }
+        .container { max-width: 1200px; margin: 0 auto; padding: 40px 20px; }
+        .grid { display: grid; grid-template-columns: 1fr 1fr; gap: 30px; }
+        .form-section { background: white; padding: 40px; border-radius: 15px; box-shadow: 0 5px 20px rgba(0,0,0,0.05); }
+        .preview-section { background: white; padding: 40px; border-radius: 15px; box-shadow: 0 5px 20px rgba(0,0,0,0.05); }
+        input, textarea, select { 
+            width: 100%; 
+            padding: 12px 15px; 
+            margin: 10px 0; 
+            border: 2px solid #e2e8f0; 
+            border-radius: 10px; 
+            font-size: 15px;
+            font-family: inherit;
+            transition: border-color 0.3s;
+        }
+        input:focus, textarea:focus, select:focus {
+            outline: none;
+            border-color: #667eea;
+        }
+        button { 
+            background: linear-gradient(135deg, #667eea, #764ba2);
+            color: white; 
+            padding: 15px 30px; 
+            border: none; 
+            cursor: pointer; 
+            width: 100%; 
+            border-radius: 10px; 
+            font-size: 16px;
+            font-weight: 600;
+            margin-top: 20px;
+            transition: all 0.3s;
+        }
+        button:hover:not(:disabled) {
+            transform: scale(1.02);
+        }
+        button:disabled { 
+            background: #ccc; 
+            cursor: not-allowed;
+        }
+        .message { 
+            padding: 15px; 
+            margin: 15px 0; 
+            border-radius: 10px; 
+            display: none;
+        }
+        .success { 
+            background: #d4edda; 
+            color: #155724; 
+            display: block; 
+        }
+        .info-banner { 
+            background: linear-gradient(135deg, #667eea, #764ba2);
+            color: white;
+            padding: 20px; 
+            border-radius: 10px; 
+            margin: 20px 0;
+        }
+        .preview-message { 
+            background: #f8f9fa; 
+            padding: 20px; 
+            margin: 15px 0; 
+            border-radius: 10px; 
+            border-left: 4px solid #667eea; 
+        }
+        h2 { color: #333; margin-bottom: 10px; }
+        h3 { color: #333; margin: 20px 0 10px 0; }
+        label { 
+            display: block; 
+            color: #666; 
+            font-weight: 600; 
+            margin-top: 15px; 
+        }
+        small { color: #999; font-size: 13px; }
+        @media (max-width: 968px) {
+            .grid { grid-template-columns: 1fr; }
+        }
+    </style>
+</head>
+'''
+
+_CUSTOMIZE_BODY = string.Template('''<body>
+    <div class="nav">
+        <div class="logo">🤖 LeaX AI</div>
+        <div><a href="/dashboard" style="color: #667eea; text-decoration: none; font-weight: 600;">← Back to Dashboard</a></div>
+    </div>
+
+    <div class="container">
+        <h2>Customize Your AI Agent</h2>
+
+        <div class="info-banner">
+            <strong>💡 Pro Tip:</strong> Just paste your website URL and we'll automatically learn about your business - services, pricing, hours, and more!
+        </div>
+
+        <div id="message" class="message"></div>
+
+        <div class="grid">
+            <div class="form-section">
+                <h3>Business Information</h3>
+                <form id="customizeForm">
+                    <label>Website URL</label>
+                    <input type="text" id="website_url" placeholder="example.com" value="$existing_url">
+                    <small>No need to type https:// - we'll add it automatically!</small>
+
+                    <label>About Your Business</label>
+                    <textarea id="custom_info" placeholder="Tell us about your services, pricing, hours, specialties..." rows="6">$existing_info</textarea>
+                    <small>The more details you provide, the better your AI will respond</small>
+
+                    <label>Agent Name</label>
+                    <input type="text" id="agent_name" placeholder="e.g., Sarah, Mike, Jessica" value="$existing_personality">
+                    <small>Give your AI a friendly name customers will love</small>
+
+                    <button type="submit" id="saveBtn">💾 Save & Preview Response</button>
+                </form>
+            </div>
+
+            <div class="preview-section">
+                <h3>🎯 Preview: How Your AI Will Respond</h3>
+                <div id="previewArea">
+                    <p style="color: #999; text-align: center; padding: 60px 20px;">Fill out the form and click "Save & Preview" to see how your AI will sound with real customer questions!</p>
+                </div>
+            </div>
+        </div>
+    </div>
+
+    <script>
+        // Website scraping runs server-side in the background - poll until the preview is ready
+        function waitForCustomization(jobId) {
+            return fetch('/api/customization-status/' + jobId)
+                .then(response => response.json())
+                .then(job => {
+                    if (job.status === 'ready') return job;
+                    if (job.status !== 'pending') throw new Error(job.error || 'Customization failed');
+                    return new Promise(resolve => setTimeout(resolve, 1000))
+                        .then(() => waitForCustomization(jobId));
+                });
+        }
+
+        document.getElementById('customizeForm').addEventListener('submit', function(e) {
+            e.preventDefault();
+
+            const saveBtn = document.getElementById('saveBtn');
+            const message = document.getElementById('message');
+
+            saveBtn.disabled = true;
+            saveBtn.textContent = '⏳ Saving & Learning From Your Website...';
+
+            const data = {
+                website_url: document.getElementById('website_url').value,
+                custom_info: document.getElementById('custom_info').value,
+                agent_name: document.getElementById('agent_name').value
+            };
+
+            fetch('/api/save-customization', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify(data)
+            })
+            .then(response => response.json())
+            .then(result => waitForCustomization(result.job_id))
+            .then(result => {
+                message.className = 'message success';
+                message.textContent = '✅ Saved! Your AI is now trained. Check the preview →';
+
+                const preview = document.getElementById('previewArea');
+                preview.innerHTML = result.preview_html;
+
+                saveBtn.disabled = false;
+                saveBtn.textContent = '💾 Save & Preview Response';
+
+                preview.scrollIntoView({ behavior: 'smooth', block: 'center' });
+            })
+            .catch(error => {
+                message.className = 'message';
+                message.style.background = '#fee';
+                message.style.color = '#c33';
+                message.style.display = 'block';
+                message.textContent = '❌ Error saving. Please try again.';
+                saveBtn.disabled = false;
+                saveBtn.textContent = '💾 Save & Preview Response';
+            });
+        });
+    </script>
+</body>
+</html>
+''')
+
+# Preview card returned by the customization job; values are escaped before substitution
+_CUSTOMIZE_PREVIEW = string.Template('''
+<div class="preview-message">
+    <p style="margin-bottom: 15px;"><strong>Customer:</strong> "Do you offer emergency services?"</p>
+    <p style="margin-bottom: 20px;"><strong>$agent_name:</strong> "$preview"</p>
+</div>
+<p style="text-align: center; margin-top: 30px;">
+    <a href="/test-agent" style="background: linear-gradient(135deg, #10b981, #059669); color: white; padding: 15px 30px; text-decoration: none; border-radius: 25px; display: inline-block; font-weight: 600;">
+        💬 Test Live Chat Now →
+    </a>
+</p>
+''')
+
+@lru_cache(maxsize=1024)
+def _render_customize_body(existing_url, existing_info_html, existing_personality):
+    """Fill the customize form with the saved values - existing_info_html is already escaped"""
+    return _CUSTOMIZE_BODY.substitute(
+        existing_url=html.escape(existing_url or ''),
+        existing_info=existing_info_html,
+        existing_personality=html.escape(existing_personality or '')
+    )
 
 @app.route('/customize')
 def customize_agent():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    with get_db() as conn:
-        c = conn.cursor()
-        c.execute('SELECT * FROM business_info WHERE user_id = ?', (session['user_id'],))
-        business = c.fetchone()
-    
-    existing_url = business['website_url'] if business else ''
-    existing_info = business['custom_info'] if business else ''
-    existing_personality = business['agent_personality'] if business else 'Sarah'
+    user_id = session['user_id']
     
-    return f'''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Customize Agent - LeaX</title>
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <style>
-            * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-            body {{ 
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-                background: #f5f7fa;
-                min-height: 100vh;
-            }}
-            .nav {{
-                background: white;
-                padding: 20px 40px;
-                box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-            }}
-            .logo {{
-                font-size: 24px;
-                font-weight: 800;
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-            }}
-            .container {{ max-width: 1200px; margin: 0 auto; padding: 40px 20px; }}
-            .grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 30px; }}
-            .form-section {{ background: white; padding: 40px; border-radius: 15px; box-shadow: 0 5px 20px rgba(0,0,0,0.05); }}
-            .preview-section {{ background: white; padding: 40px; border-radius: 15px; box-shadow: 0 5px 20px rgba(0,0,0,0.05); }}
-            input, textarea, select {{ 
-                width: 100%; 
-                padding: 12px 15px; 
-                margin: 10px 0; 
-                border: 2px solid #e2e8f0; 
-                border-radius: 10px; 
-                font-size: 15px;
-                font-family: inherit;
-                transition: border-color 0.3s;
-            }}
-            input:focus, textarea:focus, select:focus {{
-                outline: none;
-                border-color: #667eea;
-            }}
-            button {{ 
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: white; 
-                padding: 15px 30px; 
-                border: none; 
-                cursor: pointer; 
-                width: 100%; 
-                border-radius: 10px; 
-                font-size: 16px;
-                font-weight: 600;
-                margin-top: 20px;
-                transition: all 0.3s;
-            }}
-            button:hover:not(:disabled) {{
-                transform: scale(1.02);
-            }}
-            button:disabled {{ 
-                background: #ccc; 
-                cursor: not-allowed;
-            }}
-            .message {{ 
-                padding: 15px; 
-                margin: 15px 0; 
-                border-radius: 10px; 
-                display: none;
-            }}
-            .success {{ 
-                background: #d4edda; 
-                color: #155724; 
-                display: block; 
-            }}
-            .info-banner {{ 
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: white;
-                padding: 20px; 
-                border-radius: 10px; 
-                margin: 20px 0;
-            }}
-            .preview-message {{ 
-                background: #f8f9fa; 
-                padding: 20px; 
-                margin: 15px 0; 
-                border-radius: 10px; 
-                border-left: 4px solid #667eea; 
-            }}
-            h2 {{ color: #333; margin-bottom: 10px; }}
-            h3 {{ color: #333; margin: 20px 0 10px 0; }}
-            label {{ 
-                display: block; 
-                color: #666; 
-                font-weight: 600; 
-                margin-top: 15px; 
-            }}
-            small {{ color: #999; font-size: 13px; }}
-            @media (max-width: 968px) {{
-                .grid {{ grid-template-columns: 1fr; }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="nav">
-            <div class="logo">🤖 LeaX AI</div>
-            <div><a href="/dashboard" style="color: #667eea; text-decoration: none; font-weight: 600;">← Back to Dashboard</a></div>
-        </div>
+    def generate():
+        # Head goes out before the DB lookup so the browser can start on the CSS
+        yield _CUSTOMIZE_HEAD
         
-        <div class="container">
-            <h2>Customize Your AI Agent</h2>
-            
-            <div class="info-banner">
-                <strong>💡 Pro Tip:</strong> Just paste your website URL and we'll automatically learn about your business - services, pricing, hours, and more!
-            </div>
-            
-            <div id="message" class="message"></div>
-            
-            <div class="grid">
-                <div class="form-section">
-                    <h3>Business Information</h3>
-                    <form id="customizeForm">
-                        <label>Website URL</label>
-                        <input type="text" id="website_url" placeholder="example.com" value="{existing_url}">
-                        <small>No need to type https:// - we'll add it automatically!</small>
-                        
-                        <label>About Your Business</label>
-                        <textarea id="custom_info" placeholder="Tell us about your services, pricing, hours, specialties..." rows="6">{existing_info}</textarea>
-                        <small>The more details you provide, the better your AI will respond</small>
-                        
-                        <label>Agent Name</label>
-                        <input type="text" id="agent_name" placeholder="e.g., Sarah, Mike, Jessica" value="{existing_personality}">
-                        <small>Give your AI a friendly name customers will love</small>
-                        
-                        <button type="submit" id="saveBtn">💾 Save & Preview Response</button>
-                    </form>
-                </div>
-                
-                <div class="preview-section">
-                    <h3>🎯 Preview: How Your AI Will Respond</h3>
-                    <div id="previewArea">
-                        <p style="color: #999; text-align: center; padding: 60px 20px;">Fill out the form and click "Save & Preview" to see how your AI will sound with real customer questions!</p>
-                    </div>
-                </div>
-            </div>
-        </div>
+        business = get_business_cached(user_id)
         
-        <script>
-            document.getElementById('customizeForm').addEventListener('submit', function(e) {{
-                e.preventDefault();
-                
-                const saveBtn = document.getElementById('saveBtn');
-                const message = document.getElementById('message');
-                
-                saveBtn.disabled = true;
-                saveBtn.textContent = '⏳ Saving & Learning From Your Website...';
-                
-                const data = {{
-                    website_url: document.getElementById('website_url').value,
-                    custom_info: document.getElementById('custom_info').value,
-                    agent_name: document.getElementById('agent_name').value
-                }};
-                
-                fetch('/api/save-customization', {{
-                    method: 'POST',
-                    headers: {{'Content-Type': 'application/json'}},
-                    body: JSON.stringify(data)
-                }})
-                .then(response => response.json())
-                .then(result => {{
-                    message.className = 'message success';
-                    message.textContent = '✅ Saved! Your AI is now trained. Check the preview →';
-                    
-                    const preview = document.getElementById('previewArea');
-                    preview.innerHTML = `
-                        <div class="preview-message">
-                            <p style="margin-bottom: 15px;"><strong>Customer:</strong> "Do you offer emergency services?"</p>
-                            <p style="margin-bottom: 20px;"><strong>${{data.agent_name}}:</strong> "${{result.preview}}"</p>
-                        </div>
-                        <p style="text-align: center; margin-top: 30px;">
-                            <a href="/test-agent" style="background: linear-gradient(135deg, #10b981, #059669); color: white; padding: 15px 30px; text-decoration: none; border-radius: 25px; display: inline-block; font-weight: 600;">
-                                💬 Test Live Chat Now →
-                            </a>
-                        </p>
-                    `;
-                    
-                    saveBtn.disabled = false;
-                    saveBtn.textContent = '💾 Save & Preview Response';
-                    
-                    preview.scrollIntoView({{ behavior: 'smooth', block: 'center' }});
-                }})
-                .catch(error => {{
-                    message.className = 'message';
-                    message.style.background = '#fee';
-                    message.style.color = '#c33';
-                    message.style.display = 'block';
-                    message.textContent = '❌ Error saving. Please try again.';
-                    saveBtn.disabled = false;
-                    saveBtn.textContent = '💾 Save & Preview Response';
-                }});
-            }});
-        </script>
-    </body>
-    </html>
-    '''
+        existing_url = business['website_url'] if business else ''
+        existing_personality = business['agent_personality'] if business else 'Sarah'
+        
+        # Escaped once at save time; rows saved before that column existed are escaped here
+        if business and business['custom_info_html'] is not None:
+            existing_info_html = business['custom_info_html']
+        else:
+            existing_info_html = html.escape(business['custom_info'] or '') if business else ''
+        
+        yield _render_customize_body(existing_url, existing_info_html, existing_personality)
+    
+    return Response(stream_with_context(generate()), mimetype='text/html')
 
 @app.route('/api/save-customization', methods=['POST'])
 def save_customization():
@@ -2045,201 +2359,167 @@ def save_customization():
     if website_url:
         website_url = normalize_url(website_url)
     
-    website_context = ""
-    if website_url:
-        print(f"🔍 Scraping website: {website_url}")
-        scraped = scrape_website_info(website_url)
-        if scraped:
-            website_context = f"""
+    user_id = session['user_id']
+    job_id = secrets.token_urlsafe(12)
+    cache.set(customization_job_key(job_id), {'status': 'pending', 'user_id': user_id}, ttl=600)
+    
+    background_tasks.submit(_run_customization_job, job_id, user_id, session.get('business_name'),
+                            website_url, custom_info, agent_name)
+    
+    return jsonify({'success': True, 'status': 'pending', 'job_id': job_id})
+
+@app.route('/api/customization-status/<job_id>')
+def customization_status(job_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'})
+    
+    key = customization_job_key(job_id)
+    job = cache.get(key)
+    if not job or job['user_id'] != session['user_id']:
+        return jsonify({'status': 'unknown', 'error': 'Job not found'}), 404
+    
+    # Nobody polls a finished job again - drop it once the result has been handed over
+    if job['status'] != 'pending':
+        cache.delete(key)
+    
+    return jsonify(job)
+
+def _run_customization_job(job_id, user_id, business_name, website_url, custom_info, agent_name):
+    """Scrape the website, save the agent setup and build the preview reply"""
+    key = customization_job_key(job_id)
+    
+    try:
+        website_context = ""
+        if website_url:
+            print(f"🔍 Scraping website: {website_url}")
+            scraped = scrape_website_info(website_url)
+            if scraped:
+                website_context = f"""
 Website: {scraped['title']}
 Description: {scraped['description']}
 Services Found: {scraped['services_found']}
 Pricing Info: {scraped['pricing_indicators']}
 Content Summary: {scraped['content_summary']}
 """
-            print(f"✅ Website scraped successfully")
-        else:
-            print(f"⚠️ Could not scrape website")
-    
-    full_context = custom_info + "\n\n" + website_context if website_context else custom_info
-    
-    with get_db() as conn:
-        c = conn.cursor()
-        c.execute('''
-            INSERT OR REPLACE INTO business_info 
-            (user_id, website_url, custom_info, agent_personality, updated_at) 
-            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-        ''', (session['user_id'], website_url, full_context, agent_name))
-        conn.commit()
-    
-    memory_mgr.update_business_profile(session['user_id'], {
-        'website_url': website_url,
-        'custom_info': full_context,
-        'personality': agent_name
-    })
-    
-    print(f"✅ Customization saved for user {session['user_id']}")
-    
-    business_context = f"""
-Business: {session.get('business_name')}
+                print(f"✅ Website scraped successfully")
+            else:
+                print(f"⚠️ Could not scrape website")
+        
+        full_context = custom_info + "\n\n" + website_context if website_context else custom_info
+        
+        with get_db() as conn:
+            c = conn.cursor()
+            c.execute('''
+                INSERT OR REPLACE INTO business_info 
+                (user_id, website_url, custom_info, custom_info_html, agent_personality, updated_at) 
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (user_id, website_url, full_context, html.escape(full_context), agent_name))
+            conn.commit()
+        
+        cache.delete(business_cache_key(user_id))
+        
+        memory_mgr.update_business_profile(user_id, {
+            'website_url': website_url,
+            'custom_info': full_context,
+            'personality': agent_name
+        })
+        
+        print(f"✅ Customization saved for user {user_id}")
+        
+        business_context = f"""
+Business: {business_name}
 Services: {full_context or 'Full service provider'}
 Website: {website_url or 'Not provided'}
 """
-    
-    preview_response, _ = generate_human_response(
-        session.get('business_name'),
-        business_context,
-        "Do you offer emergency services?",
-        ""
-    )
-    
-    return jsonify({'success': True, 'preview': preview_response})
+        
+        # The preview question is fixed, so the answer only depends on the business details -
+        # re-saving with just a new agent name reuses it instead of calling the LLM again
+        preview_key = 'customize:preview:' + hashlib.md5(business_context.encode()).hexdigest()
+        preview_response = cache.get(preview_key)
+        if preview_response is None:
+            preview_response, preview_tokens = generate_human_response(
+                business_name,
+                business_context,
+                "Do you offer emergency services?",
+                ""
+            )
+            if preview_tokens:  # zero tokens means the canned fallback - don't keep it
+                cache.set(preview_key, preview_response, ttl=86400)
+        
+        preview_html = _CUSTOMIZE_PREVIEW.substitute(agent_name=html.escape(agent_name or ''),
+                                                     preview=html.escape(preview_response or ''))
+        
+        cache.set(key, {'status': 'ready', 'user_id': user_id, 'preview': preview_response,
+                        'preview_html': preview_html}, ttl=600)
+    except Exception:
+        cache.set(key, {'status': 'error', 'user_id': user_id, 'error': 'Could not save customization'}, ttl=600)
+        raise
+
 
+LEADS_PAGE_SIZE = 20
+
+# Display defaults and formatting are computed by SQLite so the template only interpolates.
+# Message counts are probed per lead on the page (idx_lead_conv_lead), not grouped for the whole account.
+# Pages are keyed on the last card's (lead_score, last_contact, id) rather than an offset - inbound
+# texts rewrite score and last_contact, so offsets would shift under a user who is scrolling
+_LEADS_SELECT_SQL = f'''
+    SELECT l.id, l.phone_number, l.lead_score, l.meeting_scheduled,
+           l.last_contact as cursor_contact,
+           UPPER(COALESCE(l.status, 'new')) as status,
+           COALESCE(NULLIF(l.project_type, ''), 'Not specified') as project_type,
+           COALESCE(NULLIF(l.urgency, ''), 'Not specified') as urgency,
+           strftime('%Y-%m-%d %H:%M', l.last_contact) as last_contact,
+           CASE WHEN l.lead_score >= {HOT_LEAD_SCORE} THEN '#dc3545'
+                WHEN l.lead_score >= 50 THEN '#fd7e14'
+                ELSE '#666' END as score_color,
+           (SELECT COUNT(*) FROM lead_conversations lc WHERE lc.lead_id = l.id) as message_count
+    FROM leads l
+'''
+
+_LEADS_ORDER_SQL = '''
+    ORDER BY l.lead_score DESC, l.last_contact DESC, l.id DESC
+    LIMIT ?
+'''
+
+_LEADS_FIRST_PAGE_SQL = _LEADS_SELECT_SQL + 'WHERE l.user_id = ?' + _LEADS_ORDER_SQL
+
+_LEADS_NEXT_PAGE_SQL = (_LEADS_SELECT_SQL +
+                        'WHERE l.user_id = ? AND (l.lead_score, l.last_contact, l.id) < (?, ?, ?)' +
+                        _LEADS_ORDER_SQL)
+
+def _iter_leads(user_id, after=None, limit=LEADS_PAGE_SIZE):
+    """Yield one page of lead rows while the response is streaming - after is the previous page's last key"""
+    with get_db() as conn:
+        if after is None:
+            yield from conn.execute(_LEADS_FIRST_PAGE_SQL, (user_id, limit))
+        else:
+            yield from conn.execute(_LEADS_NEXT_PAGE_SQL, (user_id, *after, limit))
 
 @app.route('/leads')
 def view_leads():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
+    user_id = session['user_id']
+    
+    # Later pages are fetched by the page itself as the user scrolls - cards only
+    if 'after_id' in request.args:
+        after_score = request.args.get('after_score', type=float)
+        after_contact = request.args.get('after_contact')
+        after_id = request.args.get('after_id', type=int)
+        if after_score is None or not after_contact or after_id is None or after_id < 1:
+            return 'Invalid page cursor', 400
+        return stream_template('_lead_cards.html',
+                               leads=_iter_leads(user_id, (after_score, after_contact, after_id)))
+    
+    # The trigger-maintained summary gives the count up front, so the header can go out first
     with get_db() as conn:
-        c = conn.cursor()
-        c.execute('''
-            SELECT l.*, 
-                   (SELECT COUNT(*) FROM lead_conversations lc WHERE lc.lead_id = l.id) as message_count
-            FROM leads l
-            WHERE l.user_id = ? 
-            ORDER BY l.lead_score DESC, l.last_contact DESC
-            LIMIT 100
-        ''', (session['user_id'],))
-        leads = [dict(row) for row in c.fetchall()]
-    
-    if not leads:
-        return '''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Leads - LeaX</title>
-            <style>
-                body { 
-                    font-family: Arial;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    min-height: 100vh;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    padding: 20px;
-                }
-                .empty-state { 
-                    background: white; 
-                    padding: 60px 40px; 
-                    border-radius: 20px; 
-                    text-align: center;
-                    max-width: 600px;
-                }
-                .btn { 
-                    background: linear-gradient(135deg, #667eea, #764ba2);
-                    color: white; 
-                    padding: 15px 30px; 
-                    text-decoration: none; 
-                    border-radius: 25px; 
-                    display: inline-block; 
-                    margin: 10px;
-                    font-weight: 600;
-                }
-            </style>
-        </head>
-        <body>
-            <div class="empty-state">
-                <h1>📋 No Leads Yet</h1>
-                <p>Test your agent to see leads automatically!</p>
-                <a href="/test-agent" class="btn">💬 Test Agent</a>
-                <a href="/dashboard" class="btn">🏠 Dashboard</a>
-            </div>
-        </body>
-        </html>
-        '''
-    
-    leads_html = ""
-    for lead in leads:
-        score_color = "#dc3545" if lead['lead_score'] >= 70 else "#fd7e14" if lead['lead_score'] >= 50 else "#666"
-        meeting_badge = '✅ MEETING SET' if lead.get('meeting_scheduled') else ''
-        
-        meeting_html = ""
-        if meeting_badge:
-            meeting_html = f'<br><span style="background: #10b981; color: white; padding: 5px 15px; border-radius: 15px; margin-top: 10px; display: inline-block;">{meeting_badge}</span>'
-        
-        leads_html += f'''
-        <div class="lead-card" style="border-left-color: {score_color};">
-            <div style="display: flex; justify-content: space-between;">
-                <div>
-                    <h3>📞 {lead["phone_number"]}</h3>
-                    <p style="color: {score_color}; font-weight: bold;">Score: {lead["lead_score"]}/100</p>
-                </div>
-                <div>
-                    <span style="background: {score_color}; color: white; padding: 5px 15px; border-radius: 15px;">
-                        {lead["status"].upper()}
-                    </span>
-                    {meeting_html}
-                </div>
-            </div>
-            <div style="margin-top: 15px;">
-                <p><strong>Project:</strong> {lead.get("project_type") or "Not specified"}</p>
-                <p><strong>Urgency:</strong> {lead.get("urgency") or "Not specified"}</p>
-                <p><strong>Messages:</strong> {lead["message_count"]}</p>
-                <p><strong>Last Contact:</strong> {lead["last_contact"]}</p>
-            </div>
-        </div>
-        '''
+        summary = conn.execute('SELECT total_leads FROM lead_summary WHERE user_id = ?', (user_id,)).fetchone()
+    total_leads = summary['total_leads'] if summary else 0
     
-    return f'''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Leads - LeaX</title>
-        <style>
-            body {{ 
-                font-family: Arial;
-                background: #f5f7fa;
-                min-height: 100vh;
-            }}
-            .nav {{
-                background: white;
-                padding: 20px 40px;
-                box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-            }}
-            .container {{ max-width: 1200px; margin: 0 auto; padding: 40px 20px; }}
-            .lead-card {{ 
-                background: white; 
-                padding: 25px; 
-                margin: 20px 0; 
-                border-radius: 15px; 
-                border-left: 5px solid #ddd;
-                box-shadow: 0 5px 20px rgba(0,0,0,0.05);
-            }}
-            .btn {{ 
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                color: white; 
-                padding: 12px 25px; 
-                text-decoration: none; 
-                border-radius: 25px; 
-                font-weight: 600;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="nav">
-            <a href="/dashboard" class="btn">← Dashboard</a>
-        </div>
-        
-        <div class="container">
-            <h1>Your Leads - {session['business_name']}</h1>
-            <p><strong>Total:</strong> {len(leads)} leads</p>
-            
-            {leads_html}
-        </div>
-    </body>
-    </html>
-    '''
+    # First page of cards renders as the rows come off the cursor
+    return stream_template('leads.html', leads=_iter_leads(user_id), total_leads=total_leads,
+                           page_size=LEADS_PAGE_SIZE, business_name=session['business_name'])
 
 @app.route('/analytics')
 def analytics():
@@ -2247,155 +2527,132 @@ def analytics():
         return redirect(url_for('login'))
     
     analytics_data = memory_mgr.get_customer_analytics(session['user_id'])
-    memory = memory_mgr.load_customer_memory(session['user_id'])
     
     if not analytics_data or analytics_data['total_conversations'] == 0:
-        return '''
-        <!DOCTYPE html>
-        <html>
-        <head><title>Analytics - LeaX</title></head>
-        <body style="font-family: Arial; text-align: center; padding: 100px;">
-            <h1>📊 No Analytics Yet</h1>
-            <p>Start testing to see analytics!</p>
-            <a href="/test-agent" style="background: #667eea; color: white; padding: 15px 30px; text-decoration: none; border-radius: 25px;">Test Agent</a>
-        </body>
-        </html>
-        '''
-    
-    recent_convos = memory['conversation_history'][-30:] if memory else []
+        analytics_data = None
     
-    return f'''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Analytics - LeaX</title>
-        <style>
-            body {{ font-family: Arial; background: #f5f7fa; }}
-            .container {{ max-width: 1200px; margin: 0 auto; padding: 40px 20px; }}
-            .stats-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 20px; }}
-            .stat-card {{ background: white; padding: 30px; border-radius: 15px; text-align: center; }}
-            .stat-number {{ font-size: 42px; font-weight: 800; color: #667eea; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>Analytics - {session['business_name']}</h1>
-            
-            <div class="stats-grid">
-                <div class="stat-card">
-                    <div class="stat-number">{analytics_data['total_conversations']}</div>
-                    <div>Conversations</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-number">{analytics_data['total_messages']}</div>
-                    <div>Messages</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-number">{analytics_data['total_calls']}</div>
-                    <div>Calls</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-number">{analytics_data['meetings_scheduled']}</div>
-                    <div>Meetings</div>
-                </div>
-            </div>
-            
-            <p style="margin-top: 30px;"><a href="/dashboard">← Back</a></p>
-        </div>
-    </body>
-    </html>
-    '''
+    return render_template('analytics.html', analytics_data=analytics_data, business_name=session['business_name'])
+
+@lru_cache(maxsize=None)
+def _pricing_page():
+    """Pricing page - nothing in it varies by user, so render it once"""
+    return render_template('pricing.html')
 
 @app.route('/pricing')
 def pricing():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    return '''
-    <!DOCTYPE html>
-    <html>
-    <head><title>Pricing - LeaX</title></head>
-    <body style="font-family: Arial; padding: 40px; text-align: center;">
-        <h1>Upgrade Your Plan</h1>
-        <p>Contact us: hr@americanpower.us</p>
-        <a href="/dashboard" style="background: #667eea; color: white; padding: 15px 30px; text-decoration: none; border-radius: 25px;">← Back</a>
-    </body>
-    </html>
-    '''
+    return _pricing_page()
+
+ADMIN_USERS_PAGE_SIZE = 50
+
+# The window count is taken before LIMIT, so one statement gives the total and the page
+_ADMIN_USERS_SQL = '''
+    SELECT id, email, business_name, plan_type, created_at, COUNT(*) OVER () as total_users
+    FROM users ORDER BY created_at DESC LIMIT ? OFFSET ?
+'''
+
+@lru_cache(maxsize=None)
+def _admin_shell():
+    """Admin page markup - every figure on it is fetched by the page, so render it once"""
+    return render_template('admin_overview.html', page_size=ADMIN_USERS_PAGE_SIZE)
+
+def _session_is_admin():
+    """True when the logged-in user is the platform admin"""
+    return 'user_id' in session and is_admin(session['user_id'], session.get('email'))
 
 @app.route('/admin')
 def admin():
-    with get_db() as conn:
-        c = conn.cursor()
-        c.execute('SELECT COUNT(*) as total FROM users')
-        total_users = c.fetchone()['total']
-        
-        c.execute('SELECT * FROM users ORDER BY created_at DESC LIMIT 20')
-        recent_users = [dict(row) for row in c.fetchall()]
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    if not _session_is_admin():
+        return 'Forbidden', 403
     
-    platform_stats = memory_mgr.get_total_usage_stats()
+    return _admin_shell()
+
+@app.route('/admin/stats.json')
+def admin_stats():
+    """Platform-wide usage totals"""
+    if not _session_is_admin():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    # Aggregates barely move between refreshes - serve the last result for a few seconds
+    platform_stats = cache.get(ADMIN_STATS_KEY)
+    if platform_stats is None:
+        platform_stats = memory_mgr.get_total_usage_stats()
+        cache.set(ADMIN_STATS_KEY, platform_stats, ttl=10)
+    
+    return jsonify(platform_stats)
+
+@app.route('/admin/users.json')
+def admin_users():
+    """One page of users, newest first, plus the overall count"""
+    if not _session_is_admin():
+        return jsonify({'error': 'Forbidden'}), 403
     
-    html = f'''
-    <!DOCTYPE html>
-    <html>
-    <head><title>Admin - LeaX</title>
-    <style>
-        body {{ font-family: Arial; padding: 20px; }}
-        table {{ width: 100%; border-collapse: collapse; }}
-        th, td {{ border: 1px solid #ddd; padding: 12px; }}
-        th {{ background: #667eea; color: white; }}
-    </style>
-    </head>
-    <body>
-        <h1>🎛️ LeaX Admin</h1>
-        <p>Total Users: {total_users}</p>
-        <p>Total Conversations: {platform_stats['total_conversations']}</p>
-        <p>Total Cost: ${platform_stats['total_cost_usd']:.2f}</p>
-        
-        <h2>Recent Users</h2>
-        <table>
-            <tr>
-                <th>ID</th>
-                <th>Email</th>
-                <th>Business</th>
-                <th>Plan</th>
-                <th>Joined</th>
-            </tr>
-    '''
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', ADMIN_USERS_PAGE_SIZE, type=int), 1), 200)
     
-    # Add table rows
-    for u in recent_users:
-        html += f'''
-            <tr>
-                <td>{u["id"]}</td>
-                <td>{u["email"]}</td>
-                <td>{u["business_name"]}</td>
-                <td>{u["plan_type"]}</td>
-                <td>{u["created_at"]}</td>
-            </tr>
-        '''
-    
-    html += '''
-        </table>
-        <p><a href="/">← Back</a></p>
-    </body>
-    </html>
-    '''
+    with get_db() as conn:
+        rows = conn.execute(_ADMIN_USERS_SQL, (limit, offset)).fetchall()
     
-    return html
+    if rows:
+        total = rows[0]['total_users']
+    else:
+        # Past the last page the window count has no row to ride on
+        with get_db() as conn:
+            total = conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+    
+    return jsonify({
+        'rows': [{key: row[key] for key in ('id', 'email', 'business_name', 'plan_type', 'created_at')}
+                 for row in rows],
+        'total': total
+    })
+
+# Dev-only: set LEAX_PROFILE=1 to see where an uncached admin load spends its time
+if os.environ.get('LEAX_PROFILE'):
+    @app.route('/admin/_profile')
+    def admin_profile():
+        profiler = cProfile.Profile()
+        profiler.enable()
+        memory_mgr.get_total_usage_stats()
+        with get_db() as conn:
+            conn.execute(_ADMIN_USERS_SQL, (ADMIN_USERS_PAGE_SIZE, 0)).fetchall()
+        _admin_shell.__wrapped__()
+        profiler.disable()
+        
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(40)
+        return Response(report.getvalue(), mimetype='text/plain')
 
 @app.route('/health')
 def health():
     """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'service': 'leax-ai'}), 200
+    return jsonify({
+        'status': 'healthy',
+        'service': 'leax-ai',
+        'intent_cache': intent_cache_info(),
+        'example_prompts_cache': _example_prompts.cache_info()._asdict(),
+        'lead_score_cache': _score_lead.cache_info()._asdict()
+    }), 200
+
+# Compile every template at import so the first request in each worker skips it -
+# with gunicorn --preload the compiled templates are shared copy-on-write
+for _template_name in app.jinja_env.list_templates():
+    app.jinja_env.get_template(_template_name)
 
 # ==================== RUN ====================
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
-    logging.info(f"🚀 LeaX Starting - Database: {DATABASE_FILE}")
-    logging.info(f"✅ Memory Manager Initialized")
-    logging.info(f"✅ Accessibility Engine Active")
-    logging.info(f"✅ Funding Tracker Active")
-    logging.info(f"✅ Government Funding Integration Complete")
-    
+    logging.info("\n".join([
+        f"🚀 LeaX Starting - Database: {DATABASE_FILE}",
+        "✅ Memory Manager Initialized",
+        "✅ Accessibility Engine Active",
+        "✅ Funding Tracker Active",
+        "✅ Government Funding Integration Complete"
+    ]))
+    
+    # Deployments start through gunicorn (see gunicorn.conf.py) - this is the local dev server
+    logging.warning("Running Flask's development server - use `gunicorn main:app` in production")
     app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 8080)))
@@ -12,6 +12,7 @@ import sqlite3
 from datetime import datetime
 from contextlib import contextmanager
 import hashlib
+from cache_manager import cache, analytics_cache_key
 
 class MemoryManager:
     """
@@ -129,6 +130,10 @@ class MemoryManager:
                 )
             ''')
             
+            # Per-caller history lookups (load_recent_conversations)
+            c.execute('CREATE INDEX IF NOT EXISTS idx_comm_user_from ON communication_log(user_id, from_number)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_comm_user_to ON communication_log(user_id, to_number)')
+            
             conn.commit()
     
     def create_customer_memory(self, user_id, business_name, email):
@@ -261,6 +266,8 @@ class MemoryManager:
                       user_id))
                 conn.commit()
                 
+                cache.delete(analytics_cache_key(user_id))
+                
                 print(f"✅ Memory saved for user {user_id} ({file_size}KB)")
     
     def log_conversation(self, user_id, conversation_data):
@@ -268,59 +275,82 @@ class MemoryManager:
         Log conversation to customer memory AND master tracking
         NEVER FORGETS - ALWAYS UPDATES
         """
+        return self.log_conversations_bulk(user_id, [conversation_data])
+    
+    def log_conversations_bulk(self, user_id, conversations):
+        """
+        Log several conversation entries with one memory load/save
+        and one master-log transaction (e.g. inbound + outbound of an exchange)
+        """
         # Load customer memory
         memory = self.load_customer_memory(user_id)
         if not memory:
             print(f"❌ Cannot log conversation - no memory for user {user_id}")
             return False
         
-        # Add to conversation history
-        conversation_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "type": conversation_data['type'],
-            "direction": conversation_data['direction'],
-            "from": conversation_data['from_number'],
-            "to": conversation_data['to_number'],
-            "content": conversation_data['content'],
-            "ai_response": conversation_data.get('ai_response', ''),
-            "duration_seconds": conversation_data.get('duration', 0),
-            "lead_id": conversation_data.get('lead_id'),
-            "ai_model": conversation_data.get('ai_model', 'gpt-3.5-turbo'),
-            "tokens_used": conversation_data.get('tokens', 0),
-            "cost_usd": conversation_data.get('cost', 0.0),
-            "intent": conversation_data.get('intent', 'general_inquiry'),
-            "sentiment": conversation_data.get('sentiment', 'neutral')
-        }
-        
-        memory['conversation_history'].append(conversation_entry)
-        
-        # Update customer database if it's an inbound message
-        if conversation_data['direction'] == 'inbound':
-            phone = conversation_data['from_number']
-            if phone not in memory['customer_database']:
-                memory['customer_database'][phone] = {
-                    "first_contact": datetime.now().isoformat(),
-                    "total_messages": 0,
-                    "last_inquiry": None,
-                    "name": None,
-                    "email": None,
-                    "company": None,
-                    "meeting_scheduled": False,
-                    "notes": []
-                }
+        log_rows = []
+        total_messages = total_calls = 0
+        
+        for conversation_data in conversations:
+            # Add to conversation history
+            conversation_entry = {
+                "timestamp": datetime.now().isoformat(),
+                "type": conversation_data['type'],
+                "direction": conversation_data['direction'],
+                "from": conversation_data['from_number'],
+                "to": conversation_data['to_number'],
+                "content": conversation_data['content'],
+                "ai_response": conversation_data.get('ai_response', ''),
+                "duration_seconds": conversation_data.get('duration', 0),
+                "lead_id": conversation_data.get('lead_id'),
+                "ai_model": conversation_data.get('ai_model', 'gpt-3.5-turbo'),
+                "tokens_used": conversation_data.get('tokens', 0),
+                "cost_usd": conversation_data.get('cost', 0.0),
+                "intent": conversation_data.get('intent', 'general_inquiry'),
+                "sentiment": conversation_data.get('sentiment', 'neutral')
+            }
             
-            # Update customer info
-            memory['customer_database'][phone]['total_messages'] += 1
-            memory['customer_database'][phone]['last_contact'] = datetime.now().isoformat()
-            memory['customer_database'][phone]['last_inquiry'] = conversation_data['content']
-        
-        # Update analytics
-        if conversation_data['type'] == 'sms':
-            memory['analytics']['total_messages'] += 1
-        elif conversation_data['type'] == 'call':
-            memory['analytics']['total_calls'] += 1
-        
-        memory['analytics']['total_conversations'] += 1
+            memory['conversation_history'].append(conversation_entry)
+            
+            # Update customer database if it's an inbound message
+            if conversation_data['direction'] == 'inbound':
+                phone = conversation_data['from_number']
+                if phone not in memory['customer_database']:
+                    memory['customer_database'][phone] = {
+                        "first_contact": datetime.now().isoformat(),
+                        "total_messages": 0,
+                        "last_inquiry": None,
+                        "name": None,
+                        "email": None,
+                        "company": None,
+                        "meeting_scheduled": False,
+                        "notes": []
+                    }
+                
+                # Update customer info
+                memory['customer_database'][phone]['total_messages'] += 1
+                memory['customer_database'][phone]['last_contact'] = datetime.now().isoformat()
+                memory['customer_database'][phone]['last_inquiry'] = conversation_data['content']
+            
+            # Update analytics
+            if conversation_data['type'] == 'sms':
+                memory['analytics']['total_messages'] += 1
+                total_messages += 1
+            else:
+                total_calls += 1
+                if conversation_data['type'] == 'call':
+                    memory['analytics']['total_calls'] += 1
+            
+            memory['analytics']['total_conversations'] += 1
+            
+            log_rows.append((user_id, conversation_data['type'], conversation_data['direction'],
+                             conversation_data['from_number'], conversation_data['to_number'],
+                             conversation_data['content'], conversation_data.get('ai_response', ''),
+                             conversation_data.get('duration', 0),
+                             conversation_data.get('lead_id'), conversation_data.get('ai_model'),
+                             conversation_data.get('tokens', 0), conversation_data.get('cost', 0.0),
+                             conversation_data.get('intent', 'general'),
+                             json.dumps(conversation_data.get('context', {}))))
         
         # Save updated memory
         self.save_customer_memory(user_id, memory)
@@ -328,31 +358,25 @@ class MemoryManager:
         # Log to master communication log with FULL CONTEXT
         with sqlite3.connect(self.master_db) as conn:
             c = conn.cursor()
-            c.execute('''
+            c.executemany('''
                 INSERT INTO communication_log
                 (user_id, communication_type, direction, from_number, to_number, 
                  content, ai_response, duration_seconds, lead_id, ai_model_used, 
                  tokens_used, cost_usd, intent_detected, conversation_context)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (user_id, conversation_data['type'], conversation_data['direction'],
-                  conversation_data['from_number'], conversation_data['to_number'],
-                  conversation_data['content'], conversation_data.get('ai_response', ''),
-                  conversation_data.get('duration', 0),
-                  conversation_data.get('lead_id'), conversation_data.get('ai_model'),
-                  conversation_data.get('tokens', 0), conversation_data.get('cost', 0.0),
-                  conversation_data.get('intent', 'general'),
-                  json.dumps(conversation_data.get('context', {}))))
+            ''', log_rows)
             
             # Update master stats
-            if conversation_data['type'] == 'sms':
-                c.execute('UPDATE customer_memories SET total_messages = total_messages + 1 WHERE user_id = ?', (user_id,))
-            else:
-                c.execute('UPDATE customer_memories SET total_calls = total_calls + 1 WHERE user_id = ?', (user_id,))
-            
-            c.execute('UPDATE customer_memories SET total_conversations = total_conversations + 1 WHERE user_id = ?', (user_id,))
+            c.execute('''
+                UPDATE customer_memories 
+                SET total_messages = total_messages + ?,
+                    total_calls = total_calls + ?,
+                    total_conversations = total_conversations + ?
+                WHERE user_id = ?
+            ''', (total_messages, total_calls, len(log_rows), user_id))
             conn.commit()
         
-        print(f"✅ Conversation logged and permanently stored for user {user_id}")
+        print(f"✅ {len(log_rows)} conversation(s) logged and permanently stored for user {user_id}")
         return True
     
     def update_customer_info(self, user_id, phone_number, customer_data):
@@ -476,14 +500,8 @@ class MemoryManager:
             if customer.get('notes'):
                 customer_info += f"Notes: {'; '.join([n.get('note', '') for n in customer['notes'][-3:]])}\n"
         
-        # Filter conversations with this phone number
-        relevant_convos = [
-            c for c in memory['conversation_history']
-            if c.get('from') == phone_number or c.get('to') == phone_number
-        ]
-        
-        # Get last N with priority on recent
-        recent = relevant_convos[-last_n_messages:] if relevant_convos else []
+        # Last N with this phone number, straight from the indexed master log
+        recent = self.load_recent_conversations(user_id, phone_number, last_n_messages)
         
         # Format for AI with FULL CONTEXT
         context = f"{customer_info}\n📝 CONVERSATION HISTORY (Last {len(recent)} messages):\n"
@@ -497,6 +515,41 @@ class MemoryManager:
         
         return context
     
+    def load_recent_conversations(self, user_id, phone_number=None, n=30):
+        """
+        Last n logged messages, oldest first, optionally only those to/from phone_number
+        Reads the communication_log tail instead of scanning the whole memory-file history
+        """
+        with sqlite3.connect(self.master_db) as conn:
+            conn.row_factory = sqlite3.Row
+            c = conn.cursor()
+            if phone_number:
+                c.execute('''
+                    SELECT timestamp, communication_type, direction, from_number, to_number, content, ai_response
+                    FROM communication_log
+                    WHERE user_id = ? AND (from_number = ? OR to_number = ?)
+                    ORDER BY id DESC LIMIT ?
+                ''', (user_id, phone_number, phone_number, n))
+            else:
+                c.execute('''
+                    SELECT timestamp, communication_type, direction, from_number, to_number, content, ai_response
+                    FROM communication_log
+                    WHERE user_id = ?
+                    ORDER BY id DESC LIMIT ?
+                ''', (user_id, n))
+            rows = c.fetchall()
+        
+        # Same keys as memory['conversation_history'] entries
+        return [{
+            "timestamp": row['timestamp'] or '',
+            "type": row['communication_type'],
+            "direction": row['direction'],
+            "from": row['from_number'],
+            "to": row['to_number'],
+            "content": row['content'] or '',
+            "ai_response": row['ai_response'] or ''
+        } for row in reversed(rows)]
+    
     def log_login(self, user_id, ip_address=None, user_agent=None):
         """Track login activity"""
         memory = self.load_customer_memory(user_id)
@@ -577,11 +630,17 @@ class MemoryManager:
         return True
     
     def get_customer_analytics(self, user_id):
-        """Get comprehensive analytics for customer"""
+        """Get comprehensive analytics for customer - cached for 60s, cleared on save"""
+        key = analytics_cache_key(user_id)
+        analytics = cache.get(key)
+        if analytics is not None:
+            return analytics
+        
         memory = self.load_customer_memory(user_id)
         if not memory:
             return None
         
+        cache.set(key, memory['analytics'], ttl=60)
         return memory['analytics']
     
     def export_all_customer_data(self, user_id):
@@ -637,27 +696,21 @@ class MemoryManager:
         with sqlite3.connect(self.master_db) as conn:
             c = conn.cursor()
             
-            stats = {}
-            
-            # Total customers
-            c.execute('SELECT COUNT(*) FROM customer_memories')
-            stats['total_customers'] = c.fetchone()[0]
-            
-            # Total communications
-            c.execute('SELECT SUM(total_conversations) FROM customer_memories')
-            stats['total_conversations'] = c.fetchone()[0] or 0
-            
-            # Total messages
-            c.execute('SELECT SUM(total_messages) FROM customer_memories')
-            stats['total_messages'] = c.fetchone()[0] or 0
-            
-            # Total calls
-            c.execute('SELECT SUM(total_calls) FROM customer_memories')
-            stats['total_calls'] = c.fetchone()[0] or 0
+            # Every per-customer counter in one pass over customer_memories
+            c.execute('''
+                SELECT COUNT(*), SUM(total_conversations), SUM(total_messages), SUM(total_calls),
+                       (SELECT SUM(cost_usd) FROM communication_log)
+                FROM customer_memories
+            ''')
+            customers, conversations, messages, calls, cost = c.fetchone()
             
-            # Total cost
-            c.execute('SELECT SUM(cost_usd) FROM communication_log')
-            stats['total_cost_usd'] = c.fetchone()[0] or 0.0
+            stats = {
+                'total_customers': customers,
+                'total_conversations': conversations or 0,
+                'total_messages': messages or 0,
+                'total_calls': calls or 0,
+                'total_cost_usd': cost or 0.0
+            }
             
             # Most active customer
             c.execute('''
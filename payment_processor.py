@@ -10,6 +10,8 @@ import os
 import sqlite3
 from datetime import datetime
 import json
+import background_tasks
+from cache_manager import cache, ADMIN_STATS_KEY, invalidate_user
 
 payment_bp = Blueprint('payments', __name__)
 
@@ -326,10 +328,11 @@ def create_user_account(user_data):
             c.execute('''
                 INSERT INTO users (email, password_hash, business_name, status, plan_type)
                 VALUES (?, ?, ?, 'active', ?)
+                RETURNING id, created_at
             ''', (user_data['email'], hash_password(user_data['password']), 
                   user_data['business_name'], user_data['plan']))
             
-            user_id = c.lastrowid
+            user_id, created_at = c.fetchone()
             
             # Create business info
             c.execute('''
@@ -339,6 +342,9 @@ def create_user_account(user_data):
             
             conn.commit()
         
+        cache.delete(ADMIN_STATS_KEY)
+        invalidate_user(user_id)
+        
         # Create memory file
         memory_mgr = MemoryManager()
         memory_mgr.create_customer_memory(
@@ -348,19 +354,22 @@ def create_user_account(user_data):
         )
         
         # Log in user
-        session['user_id'] = user_id
-        session['email'] = user_data['email']
-        session['business_name'] = user_data['business_name']
-        session['user_plan'] = user_data['plan']
+        session.update({
+            'user_id': user_id,
+            'email': user_data['email'],
+            'business_name': user_data['business_name'],
+            'user_plan': user_data['plan']
+        })
         
         # Send notification email
         try:
             from main import email_notifier
-            email_notifier.notify_new_signup({
+            background_tasks.submit(email_notifier.notify_new_signup, {
                 'user_id': user_id,
                 'business_name': user_data['business_name'],
                 'email': user_data['email'],
-                'plan_type': user_data['plan']
+                'plan_type': user_data['plan'],
+                'created_at': created_at
             })
         except:
             pass
@@ -9,6 +9,7 @@ Customers can use LeaX in 3 ways:
 from flask import Blueprint, render_template, session, redirect, url_for, request, jsonify
 from twilio.rest import Client
 import os
+from cache_manager import invalidate_user
 
 setup_wizard = Blueprint('setup_wizard', __name__)
 
@@ -92,6 +93,8 @@ def provision_number():
             ''', (phone_number, incoming_number.sid, session['user_id']))
             conn.commit()
         
+        invalidate_user(session['user_id'])
+        
         return jsonify({
             'success': True,
             'phone_number': phone_number,
@@ -127,6 +130,8 @@ def verify_forwarding():
         ''', (customer_number, session['user_id']))
         conn.commit()
     
+    invalidate_user(session['user_id'])
+    
     return jsonify({
         'success': True,
         'message': 'Setup complete! Your AI is ready.'
@@ -148,4 +153,6 @@ def mark_complete():
         ''', (session['user_id'],))
         conn.commit()
     
+    invalidate_user(session['user_id'])
+    
     return jsonify({'success': True})
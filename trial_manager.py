@@ -7,6 +7,7 @@ Admins get unlimited everything for free
 import sqlite3
 from datetime import datetime, timedelta
 from contextlib import contextmanager
+from cache_manager import invalidate_user
 
 class TrialManager:
     """Manage free trials with message limits"""
@@ -67,6 +68,7 @@ class TrialManager:
                     c = conn.cursor()
                     c.execute('UPDATE users SET is_admin = 1 WHERE id = ?', (user_id,))
                     conn.commit()
+                invalidate_user(user_id)
                 return True
         except ImportError:
             pass  # admin_override not set up yet
@@ -87,6 +89,8 @@ class TrialManager:
             
             conn.commit()
         
+        invalidate_user(user_id)
+        
         print(f"âœ… Trial started for user {user_id}: {trial_messages} messages, {trial_days} days")
         return True
     
@@ -184,6 +188,7 @@ class TrialManager:
             ''', (user_id,))
             
             conn.commit()
+            invalidate_user(user_id)
             
             new_remaining = remaining - 1
             
@@ -309,6 +314,8 @@ class TrialManager:
             
             conn.commit()
         
+        invalidate_user(user_id)
+        
         print(f"âœ… User {user_id} upgraded to {plan_type} plan")
         return True
     
@@ -361,6 +368,8 @@ class TrialManager:
             
             conn.commit()
         
+        invalidate_user(user_id)
+        
         print(f"âœ… Trial extended for user {user_id}: +{extra_messages} messages, +{extra_days} days")
         return True
     